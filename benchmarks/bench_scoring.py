@@ -0,0 +1,175 @@
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from benchmarks.fake_llm_server import add_server_arguments, server_from_args
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE = "Entry level financial and data analyst with SQL, Excel and Power BI experience."
+RESUME = "Analyst. Built monthly reconciliations, SQL reporting and Power BI dashboards for a finance team. " * 20
+
+TITLES = ["Financial Analyst", "Data Analyst", "Business Analyst", "Reconciliation Analyst", "Treasury Analyst"]
+DUTIES = [
+    "Prepare monthly reconciliations and variance analysis.",
+    "Build SQL queries and dashboards in Power BI.",
+    "Partner with accounting on month-end close.",
+    "Automate reporting workflows in Python and Excel.",
+    "Present findings to senior stakeholders.",
+    "Maintain data quality across finance systems.",
+]
+BOILERPLATE = (
+    "Benefits:\n- Dental care\n- Paid time off\n\n"
+    "We are an equal opportunity employer. We thank all applicants, however only those selected for an interview "
+    "will be contacted."
+)
+
+
+def seed_jobs(count, seed=7):
+    from src.db.init_db import init_db
+    from src.db.repository import JobRepository
+
+    init_db()
+    repo = JobRepository()
+    rng = random.Random(seed)
+    for i in range(count):
+        duties = "\n".join(f"- {duty}" for duty in rng.sample(DUTIES, 4))
+        repo.insert_job({
+            "job_id": f"bench{i:06d}",
+            "title_right_pane": rng.choice(TITLES),
+            "company_name": f"Company {i % 50}",
+            "location": "Remote",
+            "full_job_description_text": f"Responsibilities:\n{duties}\n\n{BOILERPLATE}",
+        })
+
+
+def run_one(args):
+    # Runs inside the benchmark work directory, which holds its own app.yaml and database
+    os.makedirs("db", exist_ok=True)
+    seed_jobs(args.jobs)
+
+    from src.llm.rater import score_jobs
+    from src.utils.helpers import get_config
+
+    started = time.perf_counter()
+    profiles = {f"bench{i}": {"profile": f"{PROFILE} Candidate {i}.", "resume_text": RESUME}
+                for i in range(args.profiles)}
+    stats = score_jobs(get_config(), profiles, batch_size=args.concurrency, workers=args.concurrency)
+    elapsed = time.perf_counter() - started
+
+    with open("result.json", "w") as f:
+        json.dump({**stats, "calls": dict(stats["calls"]), "elapsed": elapsed}, f)
+
+
+def write_config(workdir, backend, server_url, args):
+    config = {
+        "backend": backend,
+        "routing": {"strategy": "failover", "backends": [backend], "max_rate_limit_waits": 20},
+        "max_retries": 3,
+        "relevance": {"enabled": False},
+        "llm_requests": {"stream": not args.no_stream, "timeout": 30},
+        "ollama": {"model": "fake", "host": server_url, "requests_per_minute": args.client_rpm},
+        "openrouter": {"model": "fake", "base_url": f"{server_url}/v1", "requests_per_minute": args.client_rpm},
+        "gemini": {"model": "fake"},
+    }
+    with open(os.path.join(workdir, "app.yaml"), "w") as f:
+        yaml.safe_dump(config, f)
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(math.ceil(pct / 100 * len(ordered)) - 1, 0))]
+
+
+def run_benchmark(args):
+    server = server_from_args(args).start()
+    print(f"Fake LLM server on {server.url}")
+    rows = []
+    try:
+        for backend in args.backends:
+            for concurrency in args.concurrency:
+                server.reset_counts()
+                with tempfile.TemporaryDirectory() as workdir:
+                    write_config(workdir, backend, server.url, args)
+                    env = {**os.environ, "PYTHONPATH": REPO_ROOT, "OPENROUTER_API_KEY": "bench"}
+                    command = [sys.executable, "-m", "benchmarks.bench_scoring", "--run-one",
+                               "--jobs", str(args.jobs), "--concurrency", str(concurrency),
+                               "--profiles", str(args.profiles)]
+                    output = None if args.verbose else subprocess.DEVNULL
+                    subprocess.run(command, cwd=workdir, env=env, check=True, stdout=output)
+                    with open(os.path.join(workdir, "result.json")) as f:
+                        result = json.load(f)
+
+                calls = result["calls"]
+                api = "ollama" if backend == "ollama" else "openai"
+                rows.append({
+                    "backend": backend,
+                    "concurrency": concurrency,
+                    "scored": result["scored"],
+                    "failed": result["failed"],
+                    "jobs_per_sec": result["scored"] / result["elapsed"] if result["elapsed"] else 0.0,
+                    "p50": percentile(result["latencies"], 50),
+                    "p95": percentile(result["latencies"], 95),
+                    "p99": percentile(result["latencies"], 99),
+                    "retries": result["retries"],
+                    "errors": calls.get(f"{backend}:error", 0),
+                    "rate_limited": calls.get(f"{backend}:rate_limited", 0),
+                    "server_requests": server.counts[f"{api}:requests"],
+                    "early_closes": server.counts[f"{api}:early_close"],
+                })
+    finally:
+        server.stop()
+    return rows
+
+
+def print_report(rows):
+    header = (f"{'backend':<11}{'conc':>5}{'scored':>8}{'failed':>8}{'jobs/s':>9}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}"
+              f"{'retries':>9}{'errors':>8}{'429s':>6}{'requests':>10}{'early':>7}")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['backend']:<11}{row['concurrency']:>5}{row['scored']:>8}{row['failed']:>8}"
+              f"{row['jobs_per_sec']:>9.2f}{row['p50']:>8.2f}{row['p95']:>8.2f}{row['p99']:>8.2f}"
+              f"{row['retries']:>9}{row['errors']:>8}{row['rate_limited']:>6}{row['server_requests']:>10}"
+              f"{row['early_closes']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job scoring against a local fake LLM server.")
+    parser.add_argument("--jobs", type=int, default=100, help="Number of synthetic jobs to score per run")
+    parser.add_argument("--profiles", type=int, default=1, help="Candidate profiles each job is scored for")
+    parser.add_argument("--backends", nargs="+", default=["ollama", "openrouter"], choices=["ollama", "openrouter"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Worker counts to compare")
+    parser.add_argument("--client-rpm", type=int, default=None, help="requests_per_minute given to the scorer")
+    parser.add_argument("--no-stream", action="store_true", help="Disable streaming responses")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show scorer output")
+    parser.add_argument("--run-one", action="store_true", help=argparse.SUPPRESS)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    if args.run_one:
+        args.concurrency = args.concurrency[0]
+        run_one(args)
+        return 0
+
+    rows = run_benchmark(args)
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
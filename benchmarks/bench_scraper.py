@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from benchmarks.bench_scoring import REPO_ROOT, percentile
+from benchmarks.fake_indeed_server import LAYOUTS, add_server_arguments, load_fixture_jobs, load_recording, \
+    server_from_args
+
+FIELDS = ["title_right_pane", "company_name", "location", "pay", "job_type", "shift_and_schedule", "benefits",
+          "full_job_description_text"]
+
+
+def golden(job):
+    # The fields extract_job_details_from_right_pane should return for a fixture job
+    return {
+        "title_right_pane": job["title"],
+        "company_name": job["company"],
+        "location": job["location"],
+        "pay": job["pay"],
+        "job_type": job["job_type"],
+        "shift_and_schedule": ", ".join(job["shift_and_schedule"]) or None,
+        "benefits": ", ".join(job["benefits"]) or None,
+        "full_job_description_text": "\n".join(line.removeprefix("- ") for line in job["description"]),
+    }
+
+
+def _normalize(value):
+    # innerText line breaks and non-breaking spaces depend on the browser, so whitespace is not compared
+    return re.sub(r"\s+", " ", value).strip() if value else None
+
+
+def score_fields(expected, extracted):
+    # Per field: (matches, total) over the expected jobs; a job that was never extracted misses every field
+    scores = {field: [0, 0] for field in FIELDS}
+    for job_id, fields in expected.items():
+        actual = extracted.get(job_id, {})
+        for field in FIELDS:
+            scores[field][1] += 1
+            if job_id in extracted and _normalize(actual.get(field)) == _normalize(fields.get(field)):
+                scores[field][0] += 1
+    return scores
+
+
+def run_one(args):
+    # Runs inside the benchmark work directory, which holds its own app.yaml and database
+    from playwright.sync_api import sync_playwright
+
+    from src.db.init_db import init_db
+    from src.orchestrator import job_scraper
+    from src.utils.helpers import get_config
+
+    os.makedirs("db", exist_ok=True)
+    init_db()
+
+    extracted = {}
+    extraction_times = {}
+    job_times = []
+    extract = job_scraper.extract_job_details_from_right_pane
+
+    def timed_extract(page, job_id, title_from_card_left_pane):
+        started = time.perf_counter()
+        details = extract(page, job_id, title_from_card_left_pane)
+        extraction_times[job_id] = time.perf_counter() - started
+        extracted[job_id] = details
+        return details
+
+    job_scraper.extract_job_details_from_right_pane = timed_extract
+    if not args.keep_delays:
+        # The randomized pauses only pace requests to the live site
+        job_scraper.random_delay = lambda level='s': None
+
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.goto(args.server_url)
+
+        started = time.perf_counter()
+        last = started
+
+        def on_job_inserted(job_id):
+            nonlocal last
+            now = time.perf_counter()
+            job_times.append(now - last)
+            last = now
+
+        job_scraper.search_jobs(get_config(), on_job_inserted=on_job_inserted, page=page)
+        elapsed = time.perf_counter() - started
+        browser.close()
+
+    with open("result.json", "w") as f:
+        json.dump({"extracted": extracted, "extraction_times": list(extraction_times.values()), "job_times": job_times,
+                   "elapsed": elapsed}, f)
+
+
+def write_config(workdir):
+    # A single search with the date, pay and job type filters off; the fixture site has no filter menus
+    config = {
+        "search_criteria": {
+            "job_titles": ["Data Analyst"],
+            "locations": [{"location": "Ontario", "date_posted": "any"}],
+            "salary_min": "",
+            "job_types": [],
+        },
+        "filters": {"enabled": False},
+    }
+    with open(os.path.join(workdir, "app.yaml"), "w") as f:
+        yaml.safe_dump(config, f)
+
+
+def run_benchmark(args):
+    if args.recorded:
+        # Saved pages have a single layout of their own
+        recording = load_recording(args.recorded)
+        expected = recording["golden"]
+        layouts = [recording["name"]]
+    else:
+        expected = {job["job_id"]: golden(job) for job in load_fixture_jobs(args.fixtures)}
+        layouts = args.layouts
+
+    rows = []
+    for layout in layouts:
+        server = server_from_args(args, layout=layout).start()
+        print(f"Fake job search site on {server.url} ({layout} layout)")
+        try:
+            with tempfile.TemporaryDirectory() as workdir:
+                write_config(workdir)
+                env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+                command = [sys.executable, "-m", "benchmarks.bench_scraper", "--run-one", "--server-url", server.url]
+                if args.keep_delays:
+                    command.append("--keep-delays")
+                output = None if args.verbose else subprocess.DEVNULL
+                subprocess.run(command, cwd=workdir, env=env, check=True, stdout=output)
+                with open(os.path.join(workdir, "result.json")) as f:
+                    result = json.load(f)
+        finally:
+            server.stop()
+
+        fields = score_fields(expected, result["extracted"])
+        matched = sum(matches for matches, _ in fields.values())
+        total = sum(count for _, count in fields.values())
+        rows.append({
+            "layout": layout,
+            "jobs": len(expected),
+            "extracted": len([job_id for job_id in expected if job_id in result["extracted"]]),
+            "jobs_per_min": 60 * len(result["job_times"]) / result["elapsed"] if result["elapsed"] else 0.0,
+            "extract_p50": percentile(result["extraction_times"], 50),
+            "extract_p95": percentile(result["extraction_times"], 95),
+            "job_p50": percentile(result["job_times"], 50),
+            "job_p95": percentile(result["job_times"], 95),
+            "accuracy": matched / total if total else 0.0,
+            "fields": {field: matches / count if count else 0.0 for field, (matches, count) in fields.items()},
+        })
+    return rows
+
+
+def print_report(rows):
+    header = (f"{'layout':<10}{'jobs':>6}{'found':>7}{'jobs/min':>10}{'extract p50':>13}{'p95':>7}"
+              f"{'job p50':>9}{'p95':>7}{'accuracy':>10}")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['layout']:<10}{row['jobs']:>6}{row['extracted']:>7}{row['jobs_per_min']:>10.1f}"
+              f"{row['extract_p50']:>13.3f}{row['extract_p95']:>7.3f}{row['job_p50']:>9.2f}{row['job_p95']:>7.2f}"
+              f"{row['accuracy']:>10.1%}")
+
+    print()
+    print(f"{'field':<28}" + "".join(f"{row['layout']:>10}" for row in rows))
+    for field in FIELDS:
+        print(f"{field:<28}" + "".join(f"{row['fields'][field]:>10.0%}" for row in rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the job scraper against recorded pages on a local server.")
+    parser.add_argument("--layouts", nargs="+", default=list(LAYOUTS), choices=LAYOUTS,
+                        help="Markup variants to replay")
+    parser.add_argument("--keep-delays", action="store_true", help="Keep the scraper's randomized pauses")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show scraper output; errors are always shown")
+    parser.add_argument("--run-one", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--server-url", help=argparse.SUPPRESS)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args)
+        return 0
+
+    rows = run_benchmark(args)
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
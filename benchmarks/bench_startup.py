@@ -0,0 +1,61 @@
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS = {
+    "help": ["--help"],
+    "init-db": ["--init-db"],
+}
+
+
+def time_command(args, workdir, env):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(REPO_ROOT, "main.py"), *args], cwd=workdir, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def slowest_imports(env, count):
+    # -X importtime reports "self | cumulative | module" in microseconds on stderr
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        # Keep top-level imports and their direct children
+        if match and len(match.group(3)) <= 3:
+            rows.append((int(match.group(2)), match.group(4)))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup time for short commands.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level imports to list")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, "db"))
+        shutil.copy(os.path.join(REPO_ROOT, "app.yaml"), workdir)
+
+        print(f"{'command':<10}{'median s':>10}{'min s':>8}")
+        for name, command in COMMANDS.items():
+            timings = [time_command(command, workdir, env) for _ in range(args.runs)]
+            print(f"{name:<10}{statistics.median(timings):>10.3f}{min(timings):>8.3f}")
+
+    print("\nSlowest imports when loading main (cumulative ms):")
+    for cumulative, module in slowest_imports(env, args.top):
+        print(f"  {cumulative / 1000:>8.1f}  {module}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
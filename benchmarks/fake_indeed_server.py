@@ -0,0 +1,286 @@
+import argparse
+import html
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fake_llm_server import parse_latency
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURES_PATH = os.path.join(FIXTURES_DIR, "indeed_jobs.json")
+LAYOUTS = ("primary", "fallback", "mixed")
+
+# Saved pages keep the live site's scripts and pagination, which would leave the local server
+SCRIPT_TAG = re.compile(r"<script\b.*?</script>", re.S | re.I)
+NEXT_LINK = re.compile(r"<a\b[^>]*data-testid=[\"']pagination-page-next[\"'].*?</a>", re.S | re.I)
+PANE_FILE = re.compile(r"pane_([a-f0-9]+)\.html")
+
+SEARCH_FORM = """
+<form id="jobsearch" action="/jobs" method="get">
+  <input name="q" value="{q}"><input name="l" value="{l}"><button type="submit">Find jobs</button>
+</form>
+"""
+
+# Loads the job into the right pane in place, like the live results page does
+PANE_SCRIPT = """
+<script>
+document.addEventListener("click", function (event) {
+  var card = event.target.closest("a[data-jk], .cardOutline");
+  if (!card) return;
+  event.preventDefault();
+  var jk = card.getAttribute("data-jk") || (card.className.match(/\\bjob_([a-f0-9]{16})\\b/) || [])[1];
+  var pane = document.getElementById("jobsearch-ViewjobPaneWrapper");
+  pane.innerHTML = "";
+  fetch("/pane?jk=" + jk).then(function (r) { return r.text(); }).then(function (body) { pane.innerHTML = body; });
+});
+</script>
+"""
+
+
+def load_fixture_jobs(path=FIXTURES_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_recording(name):
+    # fixtures/<name>/ holds a saved results page (search.html), the right pane of each job on it (pane_<jk>.html)
+    # and the fields the scraper should extract from each pane (golden.json)
+    directory = name if os.path.isdir(name) else os.path.join(FIXTURES_DIR, name)
+    with open(os.path.join(directory, "search.html"), encoding="utf-8") as f:
+        search = f.read()
+    panes = {}
+    for filename in sorted(os.listdir(directory)):
+        match = PANE_FILE.fullmatch(filename)
+        if match:
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                panes[match.group(1)] = f.read()
+    with open(os.path.join(directory, "golden.json"), encoding="utf-8") as f:
+        golden = json.load(f)
+    return {"name": os.path.basename(os.path.normpath(directory)), "search": search, "panes": panes,
+            "golden": golden}
+
+
+def _page(title, body):
+    return f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>{body}</body></html>"
+
+
+def _items(values):
+    return "".join(f"<li><span>{html.escape(value)}</span></li>" for value in values)
+
+
+def _description(lines):
+    # "- " lines become bullet lists, everything else a paragraph
+    parts = []
+    bullets = []
+    for line in lines:
+        if line.startswith("- "):
+            bullets.append(f"<li>{html.escape(line[2:])}</li>")
+            continue
+        if bullets:
+            parts.append(f"<ul>{''.join(bullets)}</ul>")
+            bullets = []
+        parts.append(f"<p>{html.escape(line)}</p>")
+    if bullets:
+        parts.append(f"<ul>{''.join(bullets)}</ul>")
+    return "".join(parts)
+
+
+def render_card(job, layout):
+    jk = job["job_id"]
+    title = html.escape(job["title"])
+    if layout == "primary":
+        heading = (f'<h2 class="jobTitle"><a class="jcs-JobTitle" data-jk="{jk}" href="/viewjob?jk={jk}">'
+                   f'<span title="{title}">{title}</span></a></h2>')
+        outline = '<div class="cardOutline">'
+    else:
+        heading = f'<h2 class="jobTitle"><span title="{title}">{title}</span></h2>'
+        outline = f'<div class="cardOutline tapItem job_{jk}">'
+    return f'<li>{outline}{heading}<span class="companyName">{html.escape(job["company"])}</span></div></li>'
+
+
+def render_pane(job, layout):
+    title = html.escape(job["title"])
+    company = html.escape(job["company"])
+    location = html.escape(job["location"])
+    details = []
+    if layout == "primary":
+        header = (f'<h2 class="jobsearch-JobInfoHeader-title" data-testid="jobsearch-JobInfoHeader-title">'
+                  f'<span>{title}<span> - job post</span></span></h2>'
+                  f'<div data-testid="inlineHeader-companyName"><a href="#">{company}</a></div>'
+                  f'<div data-testid="inlineHeader-companyLocation"><div>{location}</div></div>')
+        combo = [html.escape(value) for value in (job["pay"], job["job_type"]) if value]
+        if combo:
+            header += f'<div id="salaryInfoAndJobType"><span>{combo[0]}</span>'
+            header += "".join(f"<span>&nbsp;-&nbsp;{value}</span>" for value in combo[1:]) + "</div>"
+    else:
+        header = (f'<h2 class="jobsearch-JobInfoHeader-title"><div>{title}</div><div>- job post</div></h2>'
+                  f'<div data-testid="jobsearch-CompanyInfoContainer"><div><div><div><a href="#">{company}</a>'
+                  f'</div></div></div></div>'
+                  f'<div id="jobLocationText"><div data-testid="jobsearch-JobInfoHeader-companyLocation">'
+                  f'{location}</div></div>')
+        if job["pay"]:
+            details.append(f'<div aria-label="Pay"><ul>{_items([job["pay"]])}</ul></div>')
+        if job["job_type"]:
+            details.append(f'<div aria-label="Job type"><ul>{_items([job["job_type"]])}</ul></div>')
+    if job["shift_and_schedule"]:
+        details.append(f'<div aria-label="Shift and schedule"><ul>{_items(job["shift_and_schedule"])}</ul></div>')
+
+    body = header + f'<div id="jobDetailsSection">{"".join(details)}</div>'
+    if job["benefits"]:
+        body += f'<div id="benefits" data-testid="benefits-test"><ul>{_items(job["benefits"])}</ul></div>'
+    return body + f'<div id="jobDescriptionText">{_description(job["description"])}</div>'
+
+
+class FakeIndeedServer:
+    def __init__(self, jobs=None, host="127.0.0.1", port=0, latency="fixed:0.05", layout="mixed", page_size=5,
+                 recording=None):
+        self.jobs = jobs if jobs is not None else load_fixture_jobs()
+        self.recording = recording
+        self.latency = parse_latency(latency)
+        self.layout = layout
+        self.page_size = page_size
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+
+    def layout_of(self, index):
+        if self.layout == "mixed":
+            return LAYOUTS[index % 2]
+        return self.layout
+
+    def home_page(self):
+        return _page("Job Search", SEARCH_FORM.format(q="", l=""))
+
+    def recorded_results_page(self):
+        body = NEXT_LINK.sub("", SCRIPT_TAG.sub("", self.recording["search"]))
+        if "</body>" in body:
+            return body.replace("</body>", PANE_SCRIPT + "</body>", 1)
+        return body + PANE_SCRIPT
+
+    def results_page(self, query):
+        if self.recording:
+            return self.recorded_results_page()
+        q = query.get("q", [""])[0]
+        l = query.get("l", [""])[0]
+        start = int(query.get("start", ["0"])[0])
+        cards = "".join(render_card(job, self.layout_of(index))
+                        for index, job in enumerate(self.jobs[start:start + self.page_size], start=start))
+        body = SEARCH_FORM.format(q=html.escape(q), l=html.escape(l))
+        body += f'<div id="mosaic-provider-jobcards"><ul>{cards}</ul></div>'
+        body += '<div id="jobsearch-ViewjobPaneWrapper"></div>'
+        if start + self.page_size < len(self.jobs):
+            next_query = urllib.parse.urlencode({"q": q, "l": l, "start": start + self.page_size})
+            body += f'<nav><a data-testid="pagination-page-next" href="/jobs?{next_query}">Next</a></nav>'
+        return _page(f"{html.escape(q)} jobs", body + PANE_SCRIPT)
+
+    def pane(self, jk):
+        if self.recording:
+            return self.recording["panes"].get(jk)
+        for index, job in enumerate(self.jobs):
+            if job["job_id"] == jk:
+                return render_pane(job, self.layout_of(index))
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_html(self, status, body):
+                payload = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                query = urllib.parse.parse_qs(url.query)
+                with server._lock:
+                    server.counts[url.path] += 1
+
+                if url.path == "/":
+                    self._send_html(200, server.home_page())
+                    return
+                if url.path not in ("/jobs", "/pane"):
+                    self._send_html(404, _page("Not found", "Not found"))
+                    return
+
+                time.sleep(server.latency())
+                if url.path == "/jobs":
+                    self._send_html(200, server.results_page(query))
+                    return
+                pane = server.pane(query.get("jk", [""])[0])
+                if pane is None:
+                    self._send_html(404, "")
+                else:
+                    self._send_html(200, pane)
+
+        return Handler
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--fixtures", default=FIXTURES_PATH, help="JSON file with the jobs to serve")
+    parser.add_argument("--latency", default="fixed:0.05",
+                        help="Latency of result pages and job panes in seconds: fixed:S, uniform:A,B, "
+                             "lognormal:MU,SIGMA or exp:MEAN")
+    parser.add_argument("--page-size", type=int, default=5, help="Job cards per results page")
+    parser.add_argument("--recorded", help="Serve saved pages from fixtures/<name> (or a directory) instead of "
+                                           "rendering --fixtures")
+
+
+def server_from_args(args, layout="mixed", port=0):
+    if args.recorded:
+        return FakeIndeedServer(port=port, latency=args.latency, recording=load_recording(args.recorded))
+    return FakeIndeedServer(jobs=load_fixture_jobs(args.fixtures), port=port, latency=args.latency, layout=layout,
+                            page_size=args.page_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded job search fixtures in the Indeed page layout.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--layout", choices=LAYOUTS, default="mixed", help="Markup variant of cards and job panes")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, layout=args.layout, port=args.port).start()
+    print(f"Fake job search site listening on {server.url} (search page: /, results: /jobs, job panes: /pane)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
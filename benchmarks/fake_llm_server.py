@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def parse_latency(spec):
+    """Parse a latency spec such as "fixed:0.5", "uniform:0.2,1.5", "lognormal:-0.5,0.6" or "exp:0.8" (seconds)."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(values[0], values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1.0 / values[0])
+    raise ValueError(f"Unsupported latency distribution: {spec}")
+
+
+def fake_rating(prompt):
+    digest = hashlib.sha256(prompt.encode()).digest()
+    return json.dumps({
+        "match_score": digest[0] % 101,
+        "likelihood_score": digest[1] % 101,
+        "match_reason": "Synthetic rating from the fake LLM server.",
+        "likelihood_reason": "Synthetic rating from the fake LLM server.",
+    })
+
+
+class FakeLLMServer:
+    def __init__(self, host="127.0.0.1", port=0, latency="fixed:0.2", error_rate=0.0, rate_limit_rate=0.0,
+                 rpm_limit=None, retry_after=1.0, think_chunks=0, trailing_chunks=0, chunk_delay=0.01):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm_limit = rpm_limit
+        self.retry_after = retry_after
+        self.think_chunks = think_chunks
+        self.trailing_chunks = trailing_chunks
+        self.chunk_delay = chunk_delay
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+            self._recent.clear()
+
+    def _admit(self, api):
+        # Returns an injected HTTP status, or None to serve the request
+        with self._lock:
+            self.counts[f"{api}:requests"] += 1
+            now = time.monotonic()
+            if self.rpm_limit:
+                while self._recent and now - self._recent[0] > 60:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rpm_limit:
+                    self.counts[f"{api}:429"] += 1
+                    return 429
+                self._recent.append(now)
+            roll = random.random()
+            if roll < self.rate_limit_rate:
+                self.counts[f"{api}:429"] += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.counts[f"{api}:500"] += 1
+                return 500
+        return None
+
+    def _pieces(self, content):
+        pieces = []
+        if self.think_chunks:
+            pieces = ["<think>"] + [f"thinking step {i} " for i in range(self.think_chunks)] + ["</think>"]
+        pieces += [content[i:i + 16] for i in range(0, len(content), 16)]
+        pieces += [" Let me know if you need anything else."] * self.trailing_chunks
+        return pieces
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _send_json(self, status, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_injected(self, status):
+                if status == 429:
+                    self._send_json(429, {"error": {"message": "Rate limit exceeded", "code": 429}},
+                                    {"Retry-After": str(server.retry_after)})
+                else:
+                    self._send_json(500, {"error": {"message": "Injected server error", "code": 500}})
+
+            def _start_stream(self, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            def _write_chunk(self, data):
+                payload = data.encode()
+                self.wfile.write(f"{len(payload):X}\r\n".encode() + payload + b"\r\n")
+                self.wfile.flush()
+
+            def _end_stream(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                if self.path.rstrip("/") == "/api/chat":
+                    self._handle(api="ollama")
+                elif self.path.rstrip("/").endswith("/chat/completions"):
+                    self._handle(api="openai")
+                else:
+                    self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+            def _handle(self, api):
+                body = self._read_json()
+                status = server._admit(api)
+                if status:
+                    self._send_injected(status)
+                    return
+
+                time.sleep(server.latency())
+                prompt = "".join(message.get("content", "") for message in body.get("messages", []))
+                content = fake_rating(prompt)
+                model = body.get("model", "fake")
+
+                if not body.get("stream"):
+                    if api == "ollama":
+                        self._send_json(200, {"model": model, "created_at": "2025-01-01T00:00:00Z", "done": True,
+                                              "message": {"role": "assistant", "content": content}})
+                    else:
+                        self._send_json(200, {
+                            "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                            "choices": [{"index": 0, "finish_reason": "stop",
+                                         "message": {"role": "assistant", "content": content}}],
+                        })
+                    return
+
+                try:
+                    if api == "ollama":
+                        self._stream_ollama(model, content)
+                    else:
+                        self._stream_openai(model, content)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client stopped reading after it got a complete rating
+                    server.counts[f"{api}:early_close"] += 1
+                    self.close_connection = True
+
+            def _stream_ollama(self, model, content):
+                self._start_stream("application/x-ndjson")
+                for piece in server._pieces(content):
+                    self._write_chunk(json.dumps({"model": model, "created_at": "2025-01-01T00:00:00Z", "done": False,
+                                                  "message": {"role": "assistant", "content": piece}}) + "\n")
+                    time.sleep(server.chunk_delay)
+                self._write_chunk(json.dumps({"model": model, "created_at": "2025-01-01T00:00:00Z", "done": True,
+                                              "message": {"role": "assistant", "content": ""}}) + "\n")
+                self._end_stream()
+
+            def _stream_openai(self, model, content):
+                self._start_stream("text/event-stream")
+                for piece in server._pieces(content):
+                    chunk = {"id": "fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": model,
+                             "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                    time.sleep(server.chunk_delay)
+                self._write_chunk("data: [DONE]\n\n")
+                self._end_stream()
+
+        return Handler
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--latency", default="lognormal:-1.2,0.5",
+                        help="Latency distribution in seconds: fixed:S, uniform:A,B, lognormal:MU,SIGMA or exp:MEAN")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--rpm-limit", type=int, default=None, help="Answer 429 above this many requests per minute")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--think-chunks", type=int, default=0, help="Reasoning chunks streamed before the JSON")
+    parser.add_argument("--trailing-chunks", type=int, default=0, help="Filler chunks streamed after the JSON")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Delay between streamed chunks in seconds")
+
+
+def server_from_args(args, port=0):
+    return FakeLLMServer(port=port, latency=args.latency, error_rate=args.error_rate,
+                         rate_limit_rate=args.rate_limit_rate, rpm_limit=args.rpm_limit, retry_after=args.retry_after,
+                         think_chunks=args.think_chunks, trailing_chunks=args.trailing_chunks,
+                         chunk_delay=args.chunk_delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake Ollama and OpenAI-compatible chat endpoints.")
+    parser.add_argument("--port", type=int, default=11435)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, port=args.port).start()
+    print(f"Fake LLM server listening on {server.url} (Ollama: /api/chat, OpenAI: /v1/chat/completions)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
 import argparse
-import os
 import sys
+import time
+from datetime import datetime
+from functools import partial
 
 from dotenv import load_dotenv
 
 from src.db.init_db import init_db
-from src.llm.rater import score_jobs
-from src.orchestrator.job_scraper import search_jobs
-from src.sheets.manager import sync_jobs_to_sheet
-from src.utils.helpers import extract_resume_text
-from src.utils.helpers import get_config
+from src.export.sinks import SINKS
+from src.utils import metrics
+from src.utils.helpers import get_config, load_profiles, setup_logging
+from src.utils.locks import stage_lock
+from src.utils.profiling import PROFILE_MODES, profile_stage
+
+# Stage modules are imported inside the run_* functions so each command only loads the SDKs it uses
 
 
 def run_init_db():
@@ -17,56 +21,174 @@ def run_init_db():
     init_db()
 
 
-def run_job_search():
+def run_job_search(config):
+    from src.orchestrator.job_scraper import search_jobs
+
     print("Searching for jobs...")
-    search_jobs()
+    search_jobs(config)
     print("Job search completed.")
 
 
-def run_job_scoring():
+def run_job_scoring(config):
+    from src.llm.rater import score_jobs
+
     print("Running job scoring...")
-    config = get_config()
-    resume_path = os.path.join(os.getcwd(), config["resume_path"])
-    profile = config["profile"]
+    profiles = load_profiles(config)
+    if not profiles:
+        return
+
+    score_jobs(config, profiles)
+    print("Job scoring completed.")
 
-    if not os.path.exists(resume_path):
-        print(f"Resume not found at: {resume_path}")
+
+def run_stale_rescoring(config):
+    from src.llm.rater import rescore_stale_jobs
+
+    print("Re-scoring jobs with stale scores...")
+    profiles = load_profiles(config)
+    if not profiles:
         return
 
-    resume_text = extract_resume_text(resume_path)
-    if not resume_text:
-        print("Failed to extract resume text.")
+    rescore_stale_jobs(config, profiles)
+    print("Re-scoring completed.")
+
+
+def run_streaming_pipeline(config):
+    from src.orchestrator.pipeline import run_pipeline
+
+    print("Running search, scoring and sync as a pipeline...")
+    profiles = load_profiles(config)
+    if not profiles:
         return
 
-    score_jobs(profile, resume_text)
-    print("Job scoring completed.")
+    run_pipeline(config, profiles)
+    print("Pipeline completed.")
 
 
-def run_sync_sheet():
+def run_scheduler(config, profile_mode=None):
+    from src.orchestrator.daemon import run_daemon
+
+    print("Starting daemon...")
+    profiles = load_profiles(config)
+    if not profiles:
+        return
+
+    run_daemon(config, profiles, profile_mode=profile_mode)
+    print("Daemon stopped.")
+
+
+def run_job_normalization(config):
+    from src.db.normalize import load_filter_rules
+    from src.db.repository import JobRepository
+
+    print("Normalizing stored jobs and applying filters...")
+    total, filtered = JobRepository().normalize_jobs(load_filter_rules(config))
+    print(f"Normalized {total} jobs; {filtered} are filtered out of scoring.")
+
+
+def run_sync_sheet(config):
+    from src.sheets.manager import sync_jobs_to_sheet
+
     print("Syncing jobs to Google Sheet...")
-    sync_jobs_to_sheet()
+    sync_jobs_to_sheet(config)
     print("Sync complete.")
 
 
+def run_export(export_format, output_path=None, columns=None, since_last_export=False, min_annual_pay=None,
+               work_modes=None, skip_filtered=False):
+    from src.export.manager import export_jobs
+
+    print(f"Exporting jobs as {export_format}...")
+    export_jobs(export_format, output_path=output_path, columns=columns, since_last_export=since_last_export,
+                min_annual_pay=min_annual_pay, work_modes=work_modes, skip_filtered=skip_filtered)
+    print("Export complete.")
+
+
+def run_command(command, stages, task, profile_mode=None):
+    # Stage locks keep cron runs and the daemon from working on the same stage at once
+    with stage_lock(*stages) as acquired:
+        if not acquired:
+            print(f"Another run of {', '.join(stages)} is in progress; exiting.")
+            return 1
+
+        metrics.reset()
+        started_at = datetime.now().isoformat()
+        started = time.perf_counter()
+        status = "error"
+        with profile_stage(command, profile_mode) as profile_path:
+            try:
+                task()
+                status = "ok"
+            except Exception:
+                metrics.record(errors=1)
+                raise
+            finally:
+                metrics.save_run(command, started_at, time.perf_counter() - started, status, profile_path)
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run a single task from the job pipeline.")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--init-db", action="store_true", help="Initialize the database")
     group.add_argument("--search-jobs", action="store_true", help="Search for jobs")
     group.add_argument("--score-jobs", action="store_true", help="Score jobs with resume and profile")
+    group.add_argument("--rescore-stale", action="store_true",
+                       help="Re-score jobs whose scores used a different prompt, profile, resume or model")
+    group.add_argument("--normalize-jobs", action="store_true",
+                       help="Normalize pay, job type and location of stored jobs and re-apply the filters")
     group.add_argument("--sync-sheet", action="store_true", help="Sync jobs table to Google Sheet")
+    group.add_argument("--pipeline", action="store_true",
+                       help="Search, score and sync concurrently, streaming new jobs through each stage")
+    group.add_argument("--daemon", action="store_true",
+                       help="Run search, scoring and sync on a schedule, keeping clients open between runs")
+    group.add_argument("--export", choices=sorted(SINKS), metavar="FORMAT",
+                       help=f"Export jobs to a file ({', '.join(sorted(SINKS))})")
+    parser.add_argument("--output", help="Export file path (default: exports/jobs.<format>)")
+    parser.add_argument("--columns", help="Comma-separated job columns to export")
+    parser.add_argument("--since-last-export", action="store_true",
+                        help="Only export jobs updated since the last export in this format")
+    parser.add_argument("--min-pay", type=float, help="Only export jobs paying at least this much per year")
+    parser.add_argument("--work-mode", help="Comma-separated work modes to export (remote, hybrid, on_site)")
+    parser.add_argument("--skip-filtered", action="store_true",
+                        help="Leave jobs rejected by the filters out of the export")
+    parser.add_argument("--profile", nargs="?", const="sample", choices=PROFILE_MODES,
+                        help="Profile the command and write the result to profiles/ "
+                             "(sample: folded stacks for flame graphs, cprofile: pstats file)")
 
     args = parser.parse_args()
+    # Parsed once here and passed to every stage; no module reads app.yaml on import
+    config = get_config()
 
     try:
         if args.init_db:
-            run_init_db()
+            return run_command("init-db", (), run_init_db, args.profile)
         elif args.search_jobs:
-            run_job_search()
+            setup_logging()
+            return run_command("search-jobs", ("crawl",), partial(run_job_search, config), args.profile)
         elif args.score_jobs:
-            run_job_scoring()
+            return run_command("score-jobs", ("score",), partial(run_job_scoring, config), args.profile)
+        elif args.rescore_stale:
+            return run_command("rescore-stale", ("score",), partial(run_stale_rescoring, config), args.profile)
+        elif args.normalize_jobs:
+            return run_command("normalize-jobs", ("score",), partial(run_job_normalization, config), args.profile)
         elif args.sync_sheet:
-            run_sync_sheet()
+            return run_command("sync-sheet", ("sync",), partial(run_sync_sheet, config), args.profile)
+        elif args.pipeline:
+            setup_logging()
+            return run_command("pipeline", ("crawl", "score", "sync"), partial(run_streaming_pipeline, config),
+                               args.profile)
+        elif args.daemon:
+            # The daemon records and profiles each stage run separately
+            setup_logging()
+            run_scheduler(config, profile_mode=args.profile)
+        elif args.export:
+            columns = [column.strip() for column in args.columns.split(",")] if args.columns else None
+            work_modes = [mode.strip() for mode in args.work_mode.split(",")] if args.work_mode else None
+            export = partial(run_export, args.export, output_path=args.output, columns=columns,
+                             since_last_export=args.since_last_export, min_annual_pay=args.min_pay,
+                             work_modes=work_modes, skip_filtered=args.skip_filtered)
+            return run_command("export", (), export, args.profile)
     except Exception as e:
         print(f"Error in task execution: {e}")
         import traceback
@@ -1,8 +1,48 @@
 import os
 import sqlite3
 
-def init_db():
-    conn = sqlite3.connect(os.path.abspath("db/job_matches.sqlite"))
+# Columns added after the initial schema; applied to existing databases on init
+MIGRATION_COLUMNS = {
+    "jobs": [
+        ("tokens_saved", "INTEGER"),
+        ("relevance_score", "REAL"),
+        ("pay_min_annual", "REAL"),
+        ("pay_max_annual", "REAL"),
+        ("pay_period", "TEXT"),
+        ("job_type_normalized", "TEXT"),
+        ("work_mode", "TEXT"),
+        ("location_region", "TEXT"),
+        ("filtered_reason", "TEXT"),
+    ],
+    "scores": [
+        ("prompt_fingerprint", "TEXT"),
+        ("profile_fingerprint", "TEXT"),
+        ("resume_fingerprint", "TEXT"),
+    ],
+}
+INDEXES = {
+    "idx_jobs_pay_min_annual": "jobs (pay_min_annual)",
+    "idx_jobs_pay_max_annual": "jobs (pay_max_annual)",
+    "idx_jobs_work_mode": "jobs (work_mode)",
+    "idx_jobs_location_region": "jobs (location_region)",
+    # Matches the ORDER BY of get_pending_scores so a batch stops after its first jobs instead of sorting them all
+    "idx_jobs_pending_order": "jobs (filtered_reason, relevance_score IS NULL, relevance_score DESC, job_id)",
+    # Same for get_stale_scores
+    "idx_jobs_stale_order": "jobs (filtered_reason, date_scraped DESC, job_id)",
+}
+
+
+def migrate_columns(conn):
+    c = conn.cursor()
+    for table, columns in MIGRATION_COLUMNS.items():
+        existing = {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+        for name, col_type in columns:
+            if name not in existing:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+
+
+def init_db(db_path="db/job_matches.sqlite"):
+    conn = sqlite3.connect(os.path.abspath(db_path))
     c = conn.cursor()
     c.execute('''CREATE TABLE IF NOT EXISTS jobs (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -22,7 +62,60 @@ def init_db():
         date_scraped TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         likelihood_score INTEGER,
         last_synced TIMESTAMP,
-        date_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        date_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        tokens_saved INTEGER,
+        relevance_score REAL,
+        pay_min_annual REAL,
+        pay_max_annual REAL,
+        pay_period TEXT,
+        job_type_normalized TEXT,
+        work_mode TEXT,
+        location_region TEXT,
+        filtered_reason TEXT
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS sheet_rows (
+        sheet_name TEXT NOT NULL,
+        job_id TEXT NOT NULL,
+        row_number INTEGER NOT NULL,
+        content_hash TEXT,
+        PRIMARY KEY (sheet_name, job_id)
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS exports (
+        sink TEXT PRIMARY KEY,
+        last_exported_at TIMESTAMP
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS scores (
+        job_id TEXT NOT NULL,
+        profile_id TEXT NOT NULL,
+        model TEXT NOT NULL,
+        match_score INTEGER,
+        likelihood_score INTEGER,
+        match_reason TEXT,
+        tokens_saved INTEGER,
+        scored_at TIMESTAMP,
+        prompt_fingerprint TEXT,
+        profile_fingerprint TEXT,
+        resume_fingerprint TEXT,
+        PRIMARY KEY (job_id, profile_id, model)
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        command TEXT NOT NULL,
+        started_at TIMESTAMP NOT NULL,
+        duration REAL,
+        status TEXT,
+        jobs_processed INTEGER,
+        llm_calls INTEGER,
+        prompt_tokens INTEGER,
+        tokens_saved INTEGER,
+        cache_hits INTEGER,
+        sheets_api_calls INTEGER,
+        errors INTEGER,
+        profile_path TEXT
     )''')
+    migrate_columns(conn)
+    # Created after the migration so the indexed columns exist on older databases
+    for name, target in INDEXES.items():
+        c.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
     conn.commit()
     conn.close()
@@ -0,0 +1,166 @@
+import re
+
+# Multipliers that turn a pay amount into a yearly figure (40 h weeks, 5 day weeks)
+PAY_PERIODS = {
+    "hour": 2080,
+    "day": 260,
+    "week": 52,
+    "month": 12,
+    "year": 1,
+}
+JOB_TYPES = {
+    "full_time": r"full[\s-]?time",
+    "part_time": r"part[\s-]?time",
+    "permanent": r"permanent",
+    "contract": r"contract|fixed[\s-]term",
+    "temporary": r"temporary|\btemp\b",
+    "internship": r"internship|\bintern\b|\bco-?op\b",
+    "casual": r"casual",
+    "seasonal": r"seasonal",
+    "freelance": r"freelance",
+    "apprenticeship": r"apprenticeship",
+}
+WORK_MODES = ("remote", "hybrid", "on_site")
+PROVINCES = {
+    "alberta": "AB", "british columbia": "BC", "manitoba": "MB", "new brunswick": "NB",
+    "newfoundland and labrador": "NL", "nova scotia": "NS", "northwest territories": "NT", "nunavut": "NU",
+    "ontario": "ON", "prince edward island": "PE", "quebec": "QC", "québec": "QC", "saskatchewan": "SK",
+    "yukon": "YT",
+}
+
+_AMOUNT_RE = re.compile(r"\$\s*(\d[\d,]*(?:\.\d+)?)\s*([kK])?")
+_PERIOD_RE = re.compile(r"\b(?:an?|per|/)\s*(hour|hr|day|week|month|year|yr|annum)\b|\b(hourly|daily|weekly|monthly|"
+                        r"yearly|annually)\b", re.IGNORECASE)
+_PERIOD_ALIASES = {"hr": "hour", "yr": "year", "annum": "year", "hourly": "hour", "daily": "day", "weekly": "week",
+                   "monthly": "month", "yearly": "year", "annually": "year"}
+_REGION_CODE_RE = re.compile(r",\s*([A-Z]{2})\b")
+
+
+def _amount(match):
+    value = float(match.group(1).replace(",", ""))
+    return value * 1000 if match.group(2) else value
+
+
+def _pay_period(text, amount):
+    match = _PERIOD_RE.search(text)
+    if match:
+        period = (match.group(1) or match.group(2)).lower()
+        return _PERIOD_ALIASES.get(period, period)
+    # Without a stated period, small amounts are hourly rates and large ones are salaries
+    if amount >= 10000:
+        return "year"
+    if amount < 200:
+        return "hour"
+    return None
+
+
+def normalize_pay(text):
+    if not text:
+        return None, None, None
+
+    amounts = [_amount(match) for match in _AMOUNT_RE.finditer(text)]
+    if not amounts:
+        return None, None, None
+
+    period = _pay_period(text, max(amounts))
+    if not period:
+        return None, None, None
+
+    lowered = text.lower()
+    low, high = min(amounts), max(amounts)
+    if len(amounts) == 1 and re.search(r"\b(from|starting at|at least)\b", lowered):
+        high = None
+    elif len(amounts) == 1 and re.search(r"\bup to\b", lowered):
+        low = None
+
+    multiplier = PAY_PERIODS[period]
+    return (low * multiplier if low is not None else None,
+            high * multiplier if high is not None else None,
+            period)
+
+
+def normalize_job_types(text):
+    if not text:
+        return None
+    lowered = text.lower()
+    types = [name for name, pattern in JOB_TYPES.items() if re.search(pattern, lowered)]
+    return ",".join(types) or None
+
+
+def normalize_location(text):
+    # insert_job stores "Unknown" for a missing location
+    if not text or text.strip().lower() == "unknown":
+        return None, None
+
+    lowered = text.lower()
+    if "remote" in lowered:
+        work_mode = "remote"
+    elif "hybrid" in lowered:
+        work_mode = "hybrid"
+    else:
+        work_mode = "on_site"
+
+    match = _REGION_CODE_RE.search(text)
+    if match:
+        return work_mode, match.group(1)
+    for name, code in PROVINCES.items():
+        if re.search(rf"\b{name}\b", lowered):
+            return work_mode, code
+    return work_mode, None
+
+
+def normalize_job(job):
+    pay_min_annual, pay_max_annual, pay_period = normalize_pay(job.get("pay"))
+    work_mode, location_region = normalize_location(job.get("location"))
+    return {
+        "pay_min_annual": pay_min_annual,
+        "pay_max_annual": pay_max_annual,
+        "pay_period": pay_period,
+        "job_type_normalized": normalize_job_types(job.get("job_type")),
+        "work_mode": work_mode,
+        "location_region": location_region,
+    }
+
+
+def load_filter_rules(config):
+    filters_config = config.get("filters", {})
+    if not filters_config.get("enabled", False):
+        return None
+
+    min_annual_pay = filters_config.get("min_annual_pay", config.get("search_criteria", {}).get("salary_min"))
+    return {
+        "min_annual_pay": float(min_annual_pay) if min_annual_pay else None,
+        "exclude_job_types": set(filters_config.get("exclude_job_types") or []),
+        "allowed_work_modes": set(filters_config.get("allowed_work_modes") or []),
+        "allowed_regions": {region.upper() for region in filters_config.get("allowed_regions") or []},
+        "exclude_title_keywords": [keyword.lower() for keyword in filters_config.get("exclude_title_keywords") or []],
+    }
+
+
+def filter_reason(title, normalized, rules):
+    # Only known values are filtered on; a job with missing pay or location is kept
+    if not rules:
+        return None
+
+    top_pay = normalized["pay_max_annual"] or normalized["pay_min_annual"]
+    if rules["min_annual_pay"] and top_pay is not None and top_pay < rules["min_annual_pay"]:
+        return f"Pay of ${top_pay:,.0f}/year is below the minimum of ${rules['min_annual_pay']:,.0f}"
+
+    job_types = set((normalized["job_type_normalized"] or "").split(",")) - {""}
+    excluded_types = job_types & rules["exclude_job_types"]
+    if excluded_types:
+        return f"Excluded job type: {', '.join(sorted(excluded_types))}"
+
+    work_mode = normalized["work_mode"]
+    if rules["allowed_work_modes"] and work_mode and work_mode not in rules["allowed_work_modes"]:
+        return f"Work mode {work_mode} is not allowed"
+
+    region = normalized["location_region"]
+    if rules["allowed_regions"] and region and work_mode != "remote" and region not in rules["allowed_regions"]:
+        return f"Region {region} is not allowed"
+
+    lowered_title = (title or "").lower()
+    for keyword in rules["exclude_title_keywords"]:
+        if re.search(rf"\b{re.escape(keyword)}\b", lowered_title):
+            return f"Title contains excluded keyword '{keyword}'"
+    return None
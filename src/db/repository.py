@@ -2,6 +2,19 @@ import datetime
 import os
 import sqlite3
 
+from src.db.normalize import filter_reason, normalize_job
+
+
+def _group_profiles(cursor):
+    # Rows arrive ordered by job, one per pending profile
+    jobs = []
+    for job_id, job_title, description, url, profile_id in cursor:
+        if not jobs or jobs[-1]["job_id"] != job_id:
+            jobs.append({"job_id": job_id, "job_title": job_title, "description": description, "url": url,
+                         "profile_ids": []})
+        jobs[-1]["profile_ids"].append(profile_id)
+    return jobs
+
 
 class JobRepository:
     def __init__(self, db_path="db/job_matches.sqlite"):
@@ -10,7 +23,9 @@ class JobRepository:
     def _connect(self):
         return sqlite3.connect(self.db_path)
 
-    def insert_job(self, job):
+    def insert_job(self, job, filter_rules=None):
+        title = job.get('title_right_pane') or job.get('title_from_card_left_pane')
+        normalized = normalize_job(job)
         conn = self._connect()
         c = conn.cursor()
         c.execute("""
@@ -19,11 +34,13 @@ class JobRepository:
             (
                 job_id, job_title, company, location, url, pay, job_type, 
                 shift_and_schedule, benefits, description, description_html, 
-                match_score, match_reason, likelihood_score, last_synced, date_updated
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                match_score, match_reason, likelihood_score, last_synced, date_updated,
+                pay_min_annual, pay_max_annual, pay_period, job_type_normalized, work_mode, location_region,
+                filtered_reason
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                   """, (
                       job.get('job_id'),
-                      job.get('title_right_pane') or job.get('title_from_card_left_pane'),
+                      title,
                       job.get('company_name', 'Unknown'),
                       job.get('location', 'Unknown'),
                       job.get('job_url', 'Unknown'),
@@ -37,11 +54,54 @@ class JobRepository:
                       job.get('reason', None),
                       job.get('likelihood_score', None),
                       None,
-                      job.get('date_updated', datetime.datetime.now().isoformat())
+                      job.get('date_updated', datetime.datetime.now().isoformat()),
+                      normalized['pay_min_annual'],
+                      normalized['pay_max_annual'],
+                      normalized['pay_period'],
+                      normalized['job_type_normalized'],
+                      normalized['work_mode'],
+                      normalized['location_region'],
+                      filter_reason(title, normalized, filter_rules)
                   ))
         conn.commit()
         conn.close()
 
+    def normalize_jobs(self, filter_rules=None):
+        # Backfills the normalized columns and re-applies the filter rules to every stored job
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("""
+                  SELECT job_id, job_title, pay, job_type, location, pay_min_annual, pay_max_annual, pay_period,
+                         job_type_normalized, work_mode, location_region, filtered_reason
+                  FROM jobs
+                  """)
+        rows = c.fetchall()
+        now = datetime.datetime.now().isoformat()
+        updates = []
+        filtered = 0
+        for job_id, job_title, pay, job_type, location, *current in rows:
+            normalized = normalize_job({"pay": pay, "job_type": job_type, "location": location})
+            values = [*normalized.values(), filter_reason(job_title, normalized, filter_rules)]
+            filtered += 1 if values[-1] else 0
+            # Only changed rows get a new date_updated, so --since-last-export picks up exactly those
+            if values != current:
+                updates.append((*values, now, job_id))
+        c.executemany("""
+                      UPDATE jobs
+                      SET pay_min_annual      = ?,
+                          pay_max_annual      = ?,
+                          pay_period          = ?,
+                          job_type_normalized = ?,
+                          work_mode           = ?,
+                          location_region     = ?,
+                          filtered_reason     = ?,
+                          date_updated        = ?
+                      WHERE job_id = ?
+                      """, updates)
+        conn.commit()
+        conn.close()
+        return len(rows), filtered
+
     def job_exists(self, job_id):
         conn = self._connect()
         c = conn.cursor()
@@ -50,21 +110,124 @@ class JobRepository:
         conn.close()
         return count > 0
 
-    def get_unscored_jobs(self, limit=50, offset=0):
+    def _get_pairs(self, profile_columns, profile_rows, pair_condition, pair_params, order_by, limit, job_ids=None,
+                   exclude=None):
+        # The first `limit` jobs with a matching (job, profile) pair are picked from the jobs table alone and only
+        # those are joined onto the profiles, so each batch never builds the full jobs x profiles product
+        job_filter = ""
+        job_params = []
+        if job_ids is not None:
+            if not job_ids:
+                return []
+            job_filter = f"AND j.job_id IN ({', '.join('?' * len(job_ids))})"
+            job_params = list(job_ids)
+        columns = ", ".join(["position", *profile_columns])
+        rows = ", ".join([f"({', '.join('?' * (len(profile_columns) + 1))})"] * len(profile_rows))
+        params = [value for position, row in enumerate(profile_rows) for value in (position, *row)]
+        params += [*job_params, *pair_params, -1 if limit is None else limit, *pair_params]
+
         conn = self._connect()
         c = conn.cursor()
-        c.execute("""
-                  SELECT job_id, job_title, description, url
-                  FROM jobs
-                  WHERE match_score IS NULL
-                     OR likelihood_score IS NULL LIMIT ?
-                  OFFSET ?
-                  """, (limit, offset))
-        jobs = [dict(zip([col[0] for col in c.description], row)) for row in c.fetchall()]
+        if exclude:
+            # Pairs that already failed in this run are skipped here rather than fetched and dropped every batch.
+            # They go into a temp table so a long run of failures never hits SQLite's bound parameter limit.
+            c.execute("CREATE TEMP TABLE failed_pairs (job_id TEXT, profile_id TEXT, PRIMARY KEY (job_id, profile_id))")
+            c.executemany("INSERT OR IGNORE INTO failed_pairs VALUES (?, ?)", exclude)
+            pair_condition = f"""({pair_condition})
+                     AND NOT EXISTS (SELECT 1
+                                     FROM failed_pairs f
+                                     WHERE f.job_id = j.job_id
+                                       AND f.profile_id = p.profile_id)"""
+        c.execute(f"""
+                  WITH p({columns}) AS (VALUES {rows})
+                  SELECT j.job_id, j.job_title, j.description, j.url, p.profile_id
+                  FROM (SELECT j.job_id, j.job_title, j.description, j.url, j.match_score, j.likelihood_score,
+                               j.relevance_score, j.date_scraped
+                        FROM jobs j
+                        WHERE j.filtered_reason IS NULL
+                          {job_filter}
+                          AND EXISTS (SELECT 1 FROM p WHERE {pair_condition})
+                        ORDER BY {order_by}
+                        LIMIT ?) j
+                           JOIN p
+                  WHERE {pair_condition}
+                  ORDER BY {order_by}, p.position
+                  """, params)
+        jobs = _group_profiles(c)
         conn.close()
         return jobs
 
-    def update_job_scores(self, job_id, match_score, likelihood_score, match_reason):
+    def get_pending_scores(self, profile_ids, primary_profile_id, limit=50, job_ids=None, exclude=None):
+        # Jobs with the profiles that still have no score for them. The primary profile also counts
+        # scores on the jobs table, which predate the scores table.
+        pending = """NOT EXISTS (SELECT 1
+                                 FROM scores s
+                                 WHERE s.job_id = j.job_id
+                                   AND s.profile_id = p.profile_id)
+                     AND NOT (p.profile_id = ? AND j.match_score IS NOT NULL AND j.likelihood_score IS NOT NULL)"""
+        return self._get_pairs(["profile_id"], [(profile_id,) for profile_id in profile_ids], pending,
+                               [primary_profile_id], "j.relevance_score IS NULL, j.relevance_score DESC, j.job_id",
+                               limit, job_ids=job_ids, exclude=exclude)
+
+    def get_stale_scores(self, fingerprints, model_ids, limit=50, exclude=None):
+        # Jobs with the profiles whose scores were all made with another prompt, profile, resume or model.
+        # Missing fingerprints are unknown rather than stale. Prefilter scores use no prompt or model, so only
+        # their profile and resume fingerprints count.
+        stale = f"""EXISTS (SELECT 1
+                            FROM scores s
+                            WHERE s.job_id = j.job_id
+                              AND s.profile_id = p.profile_id)
+                    AND NOT EXISTS (SELECT 1
+                                    FROM scores s
+                                    WHERE s.job_id = j.job_id
+                                      AND s.profile_id = p.profile_id
+                                      AND COALESCE(s.profile_fingerprint, p.profile_fingerprint) = p.profile_fingerprint
+                                      AND COALESCE(s.resume_fingerprint, p.resume_fingerprint) = p.resume_fingerprint
+                                      AND (s.model = 'relevance-prefilter'
+                                        OR (COALESCE(s.prompt_fingerprint, p.prompt_fingerprint) = p.prompt_fingerprint
+                                            AND s.model IN ({", ".join("?" * len(model_ids))}))))"""
+        profile_rows = [(profile_id, fingerprint["prompt"], fingerprint["profile"], fingerprint["resume"])
+                        for profile_id, fingerprint in fingerprints.items()]
+        return self._get_pairs(["profile_id", "prompt_fingerprint", "profile_fingerprint", "resume_fingerprint"],
+                               profile_rows, stale, list(model_ids), "j.date_scraped DESC, j.job_id", limit,
+                               exclude=exclude)
+
+    def insert_scores(self, scores):
+        conn = self._connect()
+        c = conn.cursor()
+        now = datetime.datetime.now().isoformat()
+        c.executemany("""
+                      INSERT OR REPLACE INTO scores (job_id, profile_id, model, match_score, likelihood_score,
+                                                     match_reason, tokens_saved, prompt_fingerprint,
+                                                     profile_fingerprint, resume_fingerprint, scored_at)
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                      """, [(*score, now) for score in scores])
+        conn.commit()
+        conn.close()
+
+    def get_job_texts(self):
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("SELECT job_title, description FROM jobs WHERE filtered_reason IS NULL")
+        rows = c.fetchall()
+        conn.close()
+        return rows
+
+    def update_relevance_scores(self, scores):
+        conn = self._connect()
+        c = conn.cursor()
+        now = datetime.datetime.now().isoformat()
+        c.executemany("""
+                      UPDATE jobs
+                      SET relevance_score = ?,
+                          date_updated    = ?
+                      WHERE job_id = ?
+                        AND relevance_score IS NOT ?
+                      """, [(score, now, job_id, score) for job_id, score in scores.items()])
+        conn.commit()
+        conn.close()
+
+    def update_job_scores(self, job_id, match_score, likelihood_score, match_reason, tokens_saved=None):
         conn = self._connect()
         c = conn.cursor()
         c.execute("""
@@ -72,16 +235,35 @@ class JobRepository:
                   SET match_score      = ?,
                       likelihood_score = ?,
                       match_reason     = ?,
+                      tokens_saved     = ?,
                       date_updated     = ?
                   WHERE job_id = ?
-                  """, (match_score, likelihood_score, match_reason, datetime.datetime.now().isoformat(), job_id))
+                  """, (match_score, likelihood_score, match_reason, tokens_saved,
+                        datetime.datetime.now().isoformat(), job_id))
+        conn.commit()
+        conn.close()
+
+    def bulk_update_job_scores(self, scores):
+        conn = self._connect()
+        c = conn.cursor()
+        now = datetime.datetime.now().isoformat()
+        c.executemany("""
+                      UPDATE jobs
+                      SET match_score      = ?,
+                          likelihood_score = ?,
+                          match_reason     = ?,
+                          date_updated     = ?
+                      WHERE job_id = ?
+                      """, [(match_score, likelihood_score, match_reason, now, job_id)
+                            for job_id, match_score, likelihood_score, match_reason in scores])
         conn.commit()
         conn.close()
 
-    def get_jobs_for_sheet(self):
+    def get_jobs_for_sheet(self, job_ids=None):
         conn = self._connect()
         cursor = conn.cursor()
-        cursor.execute("""
+        where = f"WHERE job_id IN ({', '.join('?' * len(job_ids))})" if job_ids else ""
+        cursor.execute(f"""
                        SELECT job_id,
                               job_title,
                               company,
@@ -94,8 +276,8 @@ class JobRepository:
                               date_scraped,
                               last_synced,
                               date_updated
-                       FROM jobs
-                       """)
+                       FROM jobs {where}
+                       """, list(job_ids or []))
         rows = cursor.fetchall()
         headers = [desc[0] for desc in cursor.description]
         conn.close()
@@ -111,3 +293,128 @@ class JobRepository:
                   """, (datetime.datetime.now().isoformat(), job_id))
         conn.commit()
         conn.close()
+
+    def mark_synced(self, job_ids, synced_at=None):
+        synced_at = synced_at or datetime.datetime.now().isoformat()
+        conn = self._connect()
+        c = conn.cursor()
+        c.executemany("""
+                      UPDATE jobs
+                      SET last_synced = ?
+                      WHERE job_id = ?
+                      """, [(synced_at, job_id) for job_id in job_ids])
+        conn.commit()
+        conn.close()
+
+    def get_sheet_rows(self, sheet_name):
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("""
+                  SELECT job_id, row_number, content_hash
+                  FROM sheet_rows
+                  WHERE sheet_name = ?
+                  ORDER BY row_number
+                  """, (sheet_name,))
+        rows = {job_id: (row_number, content_hash) for job_id, row_number, content_hash in c.fetchall()}
+        conn.close()
+        return rows
+
+    def upsert_sheet_rows(self, sheet_name, entries):
+        conn = self._connect()
+        c = conn.cursor()
+        c.executemany("""
+                      INSERT OR REPLACE INTO sheet_rows (sheet_name, job_id, row_number, content_hash)
+                      VALUES (?, ?, ?, ?)
+                      """, [(sheet_name, job_id, row_number, content_hash)
+                            for job_id, row_number, content_hash in entries])
+        conn.commit()
+        conn.close()
+
+    def replace_sheet_rows(self, sheet_name, entries):
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("DELETE FROM sheet_rows WHERE sheet_name = ?", (sheet_name,))
+        c.executemany("""
+                      INSERT OR REPLACE INTO sheet_rows (sheet_name, job_id, row_number, content_hash)
+                      VALUES (?, ?, ?, ?)
+                      """, [(sheet_name, job_id, row_number, content_hash)
+                            for job_id, row_number, content_hash in entries])
+        conn.commit()
+        conn.close()
+
+    def get_job_column_types(self):
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("PRAGMA table_info(jobs)")
+        column_types = {row[1]: row[2] for row in c.fetchall()}
+        conn.close()
+        return column_types
+
+    def iter_jobs_for_export(self, columns, since=None, chunk_size=1000, min_annual_pay=None, work_modes=None,
+                             skip_filtered=False):
+        unknown = set(columns) - set(self.get_job_column_types())
+        if unknown:
+            raise ValueError(f"Unknown job columns: {', '.join(sorted(unknown))}")
+
+        # Each condition is served by an index on the normalized columns
+        conditions = []
+        params = []
+        if since:
+            conditions.append("date_updated > ?")
+            params.append(since)
+        if min_annual_pay is not None:
+            conditions.append("(pay_max_annual >= ? OR (pay_max_annual IS NULL AND pay_min_annual >= ?))")
+            params += [min_annual_pay, min_annual_pay]
+        if work_modes:
+            conditions.append(f"work_mode IN ({', '.join('?' * len(work_modes))})")
+            params += list(work_modes)
+        if skip_filtered:
+            conditions.append("filtered_reason IS NULL")
+
+        query = f"SELECT {', '.join(columns)} FROM jobs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+
+        conn = self._connect()
+        try:
+            c = conn.cursor()
+            c.execute(query, params)
+            while True:
+                rows = c.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def get_last_export(self, sink):
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("SELECT last_exported_at FROM exports WHERE sink = ?", (sink,))
+        row = c.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def set_last_export(self, sink, exported_at):
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("""
+                  INSERT OR REPLACE INTO exports (sink, last_exported_at)
+                  VALUES (?, ?)
+                  """, (sink, exported_at))
+        conn.commit()
+        conn.close()
+
+    def insert_run(self, command, started_at, duration, status, metrics, profile_path=None):
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("""
+                  INSERT INTO runs (command, started_at, duration, status, jobs_processed, llm_calls, prompt_tokens,
+                                    tokens_saved, cache_hits, sheets_api_calls, errors, profile_path)
+                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                  """, (command, started_at, duration, status, metrics["jobs_processed"], metrics["llm_calls"],
+                        metrics["prompt_tokens"], metrics["tokens_saved"], metrics["cache_hits"],
+                        metrics["sheets_api_calls"], metrics["errors"], profile_path))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,49 @@
+import os
+from datetime import datetime
+
+from src.db.repository import JobRepository
+from src.export.sinks import SINKS
+from src.utils import metrics
+
+DEFAULT_COLUMNS = [
+    "job_id", "job_title", "company", "location", "url", "pay", "job_type", "match_score", "likelihood_score",
+    "match_reason", "relevance_score", "pay_min_annual", "pay_max_annual", "work_mode", "location_region",
+    "filtered_reason", "description", "date_scraped", "date_updated",
+]
+EXPORT_DIR = "exports"
+
+repo = JobRepository()
+
+
+def export_jobs(export_format, output_path=None, columns=None, since_last_export=False, chunk_size=1000,
+                min_annual_pay=None, work_modes=None, skip_filtered=False):
+    if export_format not in SINKS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    sink_class = SINKS[export_format]
+    columns = columns or DEFAULT_COLUMNS
+    column_types = repo.get_job_column_types()
+    unknown = [column for column in columns if column not in column_types]
+    if unknown:
+        raise ValueError(f"Unknown job columns: {', '.join(unknown)}")
+
+    # Taken before reading so rows updated during the export are picked up next time
+    started_at = datetime.now().isoformat()
+    since = repo.get_last_export(export_format) if since_last_export else None
+
+    if not output_path:
+        suffix = f"-{datetime.now():%Y%m%dT%H%M%S}" if since_last_export else ""
+        output_path = os.path.join(EXPORT_DIR, f"jobs{suffix}.{sink_class.extension}")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    print(f"Exporting jobs{f' updated since {since}' if since else ''} to {output_path}...")
+    with sink_class(output_path, columns, column_types) as sink:
+        for rows in repo.iter_jobs_for_export(columns, since=since, chunk_size=chunk_size,
+                                              min_annual_pay=min_annual_pay, work_modes=work_modes,
+                                              skip_filtered=skip_filtered):
+            sink.write_batch(rows)
+
+    repo.set_last_export(export_format, started_at)
+    metrics.record(jobs_processed=sink.rows_written)
+    print(f"Exported {sink.rows_written} jobs to {output_path}.")
+    return output_path
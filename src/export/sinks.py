@@ -0,0 +1,96 @@
+import csv
+import json
+
+
+class ExportSink:
+    extension = None
+
+    def __init__(self, path, columns, column_types=None):
+        self.path = path
+        self.columns = columns
+        self.column_types = column_types or {}
+        self.rows_written = 0
+
+    def write_batch(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(ExportSink):
+    extension = "csv"
+
+    def __init__(self, path, columns, column_types=None):
+        super().__init__(path, columns, column_types)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write_batch(self, rows):
+        self._writer.writerows(rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink(ExportSink):
+    extension = "jsonl"
+
+    def __init__(self, path, columns, column_types=None):
+        super().__init__(path, columns, column_types)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write_batch(self, rows):
+        self._file.writelines(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n" for row in rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink(ExportSink):
+    extension = "parquet"
+
+    def __init__(self, path, columns, column_types=None):
+        super().__init__(path, columns, column_types)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+
+        self._pa = pa
+        # Declared SQLite types give a stable schema even when a whole chunk is NULL
+        arrow_types = {"INTEGER": pa.int64(), "REAL": pa.float64()}
+        self._schema = pa.schema([
+            (column, arrow_types.get(self.column_types.get(column, "").upper(), pa.string()))
+            for column in columns
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write_batch(self, rows):
+        arrays = [
+            self._pa.array([self._coerce(row[i], field.type) for row in rows], type=field.type)
+            for i, field in enumerate(self._schema)
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+        self.rows_written += len(rows)
+
+    def _coerce(self, value, arrow_type):
+        if value is None or arrow_type != self._pa.string():
+            return value
+        return str(value)
+
+    def close(self):
+        self._writer.close()
+
+
+SINKS = {sink.extension: sink for sink in (CsvSink, JsonlSink, ParquetSink)}
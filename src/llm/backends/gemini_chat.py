@@ -1,32 +1,73 @@
 import os
+from functools import lru_cache
 
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from src.llm.model import RaterResponse
-from src.utils.helpers import get_config
+from src.llm.streaming import collect_stream
+from src.utils.rate_limit import RateLimitError
 
-config = get_config()
-model_config = config.get("gemini", {})
-model_name = model_config.get("model", "gemma-3-27b-it")
-temperature = model_config.get("temperature", 0.7)
 
+def load_settings(config):
+    model_config = config.get("gemini", {})
+    request_config = config.get("llm_requests", {})
+    model_name = model_config.get("model", "gemma-3-27b-it")
+    return {
+        "model": model_name,
+        "temperature": model_config.get("temperature", 0.7),
+        # Gemma models on the Gemini API reject JSON mode
+        "structured_output": model_config.get("structured_output", not model_name.startswith("gemma")),
+        "stream": request_config.get("stream", True),
+        "timeout": request_config.get("timeout", 120),
+    }
 
-def generate(prompt):
-    client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-    response = client.models.generate_content(
+
+def _retry_delay(error):
+    # 429 bodies carry a google.rpc.RetryInfo detail such as {"retryDelay": "34s"}
+    body = error.details if isinstance(error.details, dict) else {}
+    for detail in body.get("error", {}).get("details", []):
+        delay = detail.get("retryDelay")
+        if delay:
+            try:
+                return float(delay.rstrip("s"))
+            except ValueError:
+                return None
+    return None
+
+
+def _chunk_text(chunk):
+    return chunk.text
+
+
+@lru_cache(maxsize=1)
+def _client(timeout):
+    return genai.Client(
+        api_key=os.environ.get("GEMINI_API_KEY"),
+        http_options=types.HttpOptions(timeout=int(timeout * 1000)) if timeout else None,
+    )
+
+
+def generate(settings, prompt, deadline=None, cancel_event=None):
+    client = _client(settings["timeout"])
+    request = dict(
         contents=prompt,
-        model=model_name,
+        model=settings["model"],
         config=types.GenerateContentConfig(
-            temperature=temperature,
-            # response_mime_type="application/json",
+            temperature=settings["temperature"],
+            response_mime_type="application/json" if settings["structured_output"] else None,
             response_schema=RaterResponse
         )
     )
+    try:
+        if settings["stream"]:
+            return collect_stream(client.models.generate_content_stream(**request), _chunk_text, deadline, cancel_event)
+        response = client.models.generate_content(**request)
+    except errors.APIError as e:
+        if e.code == 429:
+            raise RateLimitError(str(e), retry_after=_retry_delay(e)) from e
+        raise
 
     if not response.text:
         return None
-
-    if "```json" in response.text:
-        return response.text.split("```json")[1].split("```")[0].strip()
     return response.text
@@ -1,39 +1,50 @@
-from ollama import Client
-
-from src.utils.helpers import get_config
-
-ollama_client = Client()
-config = get_config()
-model_config = config.get("ollama", {})
-model_name = model_config.get("model", "llama3.1")
-temperature = model_config.get("temperature", 0.7)
-
-
-def generate(prompt):
-    response = ollama_client.chat(
-        model=model_name,
-        messages=[{"role": "user", "content": prompt}],
-        options={
-            "temperature": temperature,
-        }
-    )
-
-    is_thinking = check_is_thinking(response['message']['content'])
-
-    return response['message']['content'] if not is_thinking else extract_non_thinking_response(
-        response['message']['content'])
-
-
-def check_is_thinking(message):
-    if "<think>" in message.lower() or "</think>" in message.lower():
-        return True
-    return False
-
-
-def extract_non_thinking_response(message):
-    start = message.lower().find("<think>")
-    end = message.lower().find("</think>")
-
-    if start != -1 and end != -1:
-        return message[:start] + message[end + len("</think>"):]
-    return message
+from functools import lru_cache
+
+from ollama import Client, ResponseError
+
+from src.llm.model import rater_json_schema
+from src.llm.streaming import collect_stream
+from src.utils.rate_limit import RateLimitError
+
+
+def load_settings(config):
+    model_config = config.get("ollama", {})
+    request_config = config.get("llm_requests", {})
+    return {
+        "model": model_config.get("model", "llama3.1"),
+        "temperature": model_config.get("temperature", 0.7),
+        "structured_output": model_config.get("structured_output", True),
+        "host": model_config.get("host"),
+        "stream": request_config.get("stream", True),
+        "timeout": request_config.get("timeout", 120),
+    }
+
+
+@lru_cache(maxsize=1)
+def _client(host, timeout):
+    return Client(host=host, timeout=timeout)
+
+
+def _chunk_text(chunk):
+    return chunk['message']['content']
+
+
+def generate(settings, prompt, deadline=None, cancel_event=None):
+    try:
+        response = _client(settings["host"], settings["timeout"]).chat(
+            model=settings["model"],
+            messages=[{"role": "user", "content": prompt}],
+            format=rater_json_schema() if settings["structured_output"] else None,
+            options={
+                "temperature": settings["temperature"],
+            },
+            stream=settings["stream"],
+        )
+        if settings["stream"]:
+            return collect_stream(response, _chunk_text, deadline, cancel_event)
+    except ResponseError as e:
+        if e.status_code in (429, 503):
+            raise RateLimitError(str(e)) from e
+        raise
+
+    return response['message']['content']
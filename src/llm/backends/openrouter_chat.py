@@ -1,30 +1,64 @@
 import os
+from functools import lru_cache
 
+import openai
 from openai import OpenAI
 
-from src.utils.helpers import get_config
+from src.llm.model import rater_response_format
+from src.llm.streaming import collect_stream
+from src.utils.rate_limit import RateLimitError, retry_after_from_headers
 
-config = get_config()
-model_config = config.get("openrouter", {})
-model_name = model_config.get("model", "meta-llama/llama-4-scout:free")
-temperature = model_config.get("temperature", 0.7)
 
+def load_settings(config):
+    model_config = config.get("openrouter", {})
+    request_config = config.get("llm_requests", {})
+    return {
+        "model": model_config.get("model", "meta-llama/llama-4-scout:free"),
+        "temperature": model_config.get("temperature", 0.7),
+        "structured_output": model_config.get("structured_output", True),
+        "base_url": model_config.get("base_url", "https://openrouter.ai/api/v1"),
+        "stream": request_config.get("stream", True),
+        "timeout": request_config.get("timeout", 120),
+    }
 
-def generate(prompt):
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
+
+def _chunk_text(chunk):
+    if not chunk.choices:
+        return None
+    return chunk.choices[0].delta.content
+
+
+# Created once per process so long-running workers keep their HTTP connections open
+@lru_cache(maxsize=1)
+def _client(base_url, timeout):
+    return OpenAI(
+        base_url=base_url,
         api_key=os.getenv("OPENROUTER_API_KEY"),
+        timeout=timeout,
+        # Retries and backoff are handled by the router and its rate limiter
+        max_retries=0,
     )
-    response = client.chat.completions.create(
-        messages=[
-            {
-                "role": "user",
-                "content": prompt,
-            }
-        ],
-        model=model_name,
-        temperature=temperature,
-    )
+
+
+def generate(settings, prompt, deadline=None, cancel_event=None):
+    client = _client(settings["base_url"], settings["timeout"])
+    try:
+        response = client.chat.completions.create(
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+            model=settings["model"],
+            temperature=settings["temperature"],
+            response_format=rater_response_format() if settings["structured_output"] else openai.NOT_GIVEN,
+            stream=settings["stream"],
+        )
+        if settings["stream"]:
+            return collect_stream(response, _chunk_text, deadline, cancel_event)
+    except openai.RateLimitError as e:
+        raise RateLimitError(str(e), retry_after=retry_after_from_headers(e.response.headers)) from e
 
     if not response.choices:
         return None
@@ -0,0 +1,103 @@
+import re
+
+# Rough BPE approximation: long words split into ~6 letter pieces, numbers into
+# 3 digit groups and every punctuation mark counted on its own.
+_TOKEN_RE = re.compile(r"[A-Za-z]{1,6}|\d{1,3}|[^\sA-Za-z\d]")
+
+_BOILERPLATE_HEADINGS = re.compile(
+    r"^(benefits|perks|what we offer|what's in it for you|why work (for|with) us|"
+    r"about (us|the company|the team)|who we are|our (company|story|values|commitment)|"
+    r"equal (employment )?opportunit|eeo|diversity|inclusion|accessibility|accommodation|"
+    r"disclaimer|privacy|how to apply|application process)",
+    re.IGNORECASE,
+)
+
+_BOILERPLATE_SENTENCES = re.compile(
+    r"(equal (employment )?opportunity employer|without regard to (race|age|gender)|"
+    r"accommodations? (are|is) available|request an? accommodation|"
+    r"accessibility for ontarians|\baoda\b|"
+    r"we thank all applicants|only (those|candidates) selected (for an interview )?will be contacted|"
+    r"committed to (diversity|inclusion|employment equity|an inclusive)|"
+    r"background check|privacy (policy|notice)|e-?verify)",
+    re.IGNORECASE,
+)
+
+_BULLET_RE = re.compile(r"^([-*•·▪●]|\d+[.)])\s")
+_HEADING_MAX_WORDS = 8
+
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    return len(_TOKEN_RE.findall(text))
+
+
+def collapse_whitespace(text):
+    lines = [re.sub(r"[ \t\u00a0]+", " ", line).strip() for line in text.splitlines()]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _is_heading(line):
+    if _BULLET_RE.match(line):
+        return False
+    stripped = line.strip().rstrip(":").strip()
+    if not stripped or len(stripped.split()) > _HEADING_MAX_WORDS:
+        return False
+    return line.strip().endswith(":") or not stripped.endswith((".", "!", "?", ","))
+
+
+def strip_boilerplate(text):
+    kept = []
+    seen = set()
+    skipping = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            kept.append("")
+            continue
+
+        if _is_heading(stripped):
+            skipping = bool(_BOILERPLATE_HEADINGS.match(stripped.lstrip("#*-• ")))
+            if skipping:
+                continue
+        elif skipping:
+            continue
+
+        if _BOILERPLATE_SENTENCES.search(stripped):
+            continue
+
+        # Repeated company blurbs and bullet lists often appear twice in scraped pages
+        key = stripped.lower()
+        if len(key) > 40 and key in seen:
+            continue
+        seen.add(key)
+        kept.append(stripped)
+    return "\n".join(kept)
+
+
+def truncate_to_budget(text, max_tokens):
+    if not max_tokens or max_tokens <= 0:
+        return text
+    for i, match in enumerate(_TOKEN_RE.finditer(text)):
+        if i == max_tokens:
+            return text[:match.start()].rstrip() + " …"
+    return text
+
+
+def compact_text(text, max_tokens=None, strip=True):
+    if not text:
+        return text, 0
+    original_tokens = estimate_tokens(text)
+    compacted = strip_boilerplate(text) if strip else text
+    compacted = collapse_whitespace(compacted)
+    compacted = truncate_to_budget(compacted, max_tokens)
+    return compacted, max(original_tokens - estimate_tokens(compacted), 0)
+
+
+def compact_job_description(description, max_tokens=None):
+    return compact_text(description, max_tokens=max_tokens, strip=True)
+
+
+def compact_resume(resume_text, max_tokens=None):
+    return compact_text(resume_text, max_tokens=max_tokens, strip=False)
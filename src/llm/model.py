@@ -6,3 +6,16 @@ class RaterResponse(BaseModel):
     likelihood_score: int
     match_reason: str
     likelihood_reason: str
+
+
+def rater_json_schema():
+    return RaterResponse.model_json_schema()
+
+
+def rater_response_format():
+    # OpenAI style strict schemas require every property and no extra keys
+    schema = {**rater_json_schema(), "additionalProperties": False}
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "rater_response", "strict": True, "schema": schema},
+    }
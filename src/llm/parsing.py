@@ -0,0 +1,106 @@
+import json
+import re
+
+from pydantic import ValidationError
+
+from src.llm.model import RaterResponse
+
+_THINK_RE = re.compile(r"<think>.*?</think>", re.IGNORECASE | re.DOTALL)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.IGNORECASE | re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_UNQUOTED_KEY_RE = re.compile(rf"([{{,]\s*)({'|'.join(RaterResponse.model_fields)})(\s*:)")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+def strip_thinking(text):
+    text = _THINK_RE.sub("", text)
+    # A reasoning block cut off before </think> never contains the answer
+    end = text.lower().find("</think>")
+    if end != -1:
+        text = text[end + len("</think>"):]
+    start = text.lower().find("<think>")
+    if start != -1:
+        text = text[:start]
+    return text
+
+
+def _object_end(text, start):
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
+
+
+def extract_json_object(text):
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    end = _object_end(text, start)
+    # Unbalanced: return the tail and let repair_json try to close it
+    return text[start:end] if end else text[start:]
+
+
+def find_complete_object(text):
+    start = text.find("{")
+    if start == -1:
+        return None
+    end = _object_end(text, start)
+    return text[start:end] if end else None
+
+
+def repair_json(text):
+    text = text.translate(_SMART_QUOTES).strip()
+    text = _UNQUOTED_KEY_RE.sub(r'\1"\2"\3', text)
+    if '"' not in text:
+        text = text.replace("'", '"')
+    text = re.sub(r"\bTrue\b", "true", text)
+    text = re.sub(r"\bFalse\b", "false", text)
+    text = re.sub(r"\bNone\b", "null", text)
+    text = _TRAILING_COMMA_RE.sub(r"\1", text)
+
+    # Close a truncated object: an open string first, then any open braces
+    quotes = len(re.findall(r'(?<!\\)"', text))
+    if quotes % 2:
+        text += '"'
+    text = text.rstrip().rstrip(",")
+    text += "}" * max(text.count("{") - text.count("}"), 0)
+    return text
+
+
+def parse_rater_response(text, repair=True):
+    if not text:
+        return None
+
+    candidate = extract_json_object(strip_thinking(text))
+    if candidate is None:
+        return None
+
+    attempts = (candidate, repair_json(candidate)) if repair else (candidate,)
+    for attempt in attempts:
+        try:
+            return RaterResponse.model_validate(json.loads(attempt))
+        except (ValueError, ValidationError):
+            continue
+    return None
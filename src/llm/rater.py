@@ -1,35 +1,19 @@
-import json
+import hashlib
 import time
+from collections import Counter
 from multiprocessing import Pool, cpu_count
 
 from src.db.repository import JobRepository
-from src.llm.backends import ollama_chat, openrouter_chat, gemini_chat
-from src.utils.helpers import get_config
+from src.llm.compaction import compact_job_description, compact_resume, estimate_tokens, strip_boilerplate
+from src.llm.parsing import parse_rater_response
+from src.llm.relevance import fit_idf, relevance_scores
+from src.llm.router import BackendRouter
+from src.utils import metrics
+from src.utils.rate_limit import RateLimitError, backoff_delay
 
 repo = JobRepository()
-config = get_config()
-backend = config.get("backend", "ollama")
-max_retries = config.get("max_retries", 3)
-
-
-def make_chat_completion(prompt):
-    if backend == "ollama":
-        return ollama_chat.generate(prompt)
-    elif backend == "openrouter":
-        return openrouter_chat.generate(prompt)
-    elif backend == "gemini":
-        return gemini_chat.generate(prompt)
-    else:
-        raise ValueError(f"Unsupported backend: {backend}")
-
 
-def process_job(args):
-    job, profile, resume_text = args
-    job_desc = job.get("description")
-    if not job_desc:
-        return None
-
-    prompt = f"""
+PROMPT_TEMPLATE = """
 You are a job matching assistant.
 
 Compare the following job description with the candidate's profile and resume. Evaluate two things:
@@ -62,59 +46,306 @@ Resume:
 {resume_text}
 """
 
+# Set once per worker by the pool initializer instead of being pickled into every task
+_worker_profiles = None
+_worker_router = None
+_worker_settings = None
+
+
+def _init_worker(profiles, router, settings):
+    global _worker_profiles, _worker_router, _worker_settings
+    _worker_profiles = profiles
+    _worker_router = router
+    _worker_settings = settings
+
+
+def scoring_settings(config):
+    return {
+        "max_retries": config.get("max_retries", 3),
+        "max_rate_limit_waits": config.get("routing", {}).get("max_rate_limit_waits", 10),
+        "max_description_tokens": config.get("compaction", {}).get("max_description_tokens", 1500),
+    }
+
+
+def fingerprint(text):
+    return hashlib.sha256((text or "").encode()).hexdigest()[:16]
+
+
+def build_prompt(profile, job_desc, resume_text):
+    return PROMPT_TEMPLATE.format(profile=profile, job_desc=job_desc, resume_text=resume_text)
+
+
+def rate_prompt(job_id, prompt):
+    max_retries = _worker_settings["max_retries"]
+    max_rate_limit_waits = _worker_settings["max_rate_limit_waits"]
+    started = time.perf_counter()
+    calls_before = Counter(_worker_router.call_counts)
     retries = 0
+    rate_limit_waits = 0
     parsed = None
+    backend_name = None
     while retries < max_retries:
+        result = None
         try:
-            result = make_chat_completion(prompt)
+            backend_name, result = _worker_router.generate(prompt)
             if not result:
-                print(f"Empty response for job {job['job_id']}")
-                time.sleep(5)
-            parsed = json.loads(result)
+                raise ValueError(f"Empty response from {backend_name}")
+            # Repairs near-valid JSON locally; only unrecoverable output costs another call
+            parsed = parse_rater_response(result)
+            if not parsed:
+                raise ValueError(f"Response from {backend_name} is not a valid rating")
             break
+        except RateLimitError as e:
+            # Every backend is rate limited; the buckets already hold off until the limit resets
+            rate_limit_waits += 1
+            if rate_limit_waits > max_rate_limit_waits:
+                print(f"Giving up on job {job_id} after {rate_limit_waits} rate limited attempts: {e}")
+                break
         except Exception as e:
             retries += 1
-            print(f"[Retry {retries}/3] Failed to parse job {job['job_id']}: {e}")
+            print(f"[Retry {retries}/{max_retries}] Failed to parse job {job_id}: {e}")
             if result:
                 print(f"Response: {result}")
+            if retries < max_retries:
+                time.sleep(backoff_delay(retries))
+
+    res = {
+        "scored": parsed is not None,
+        "latency": time.perf_counter() - started,
+        "retries": retries,
+        "rate_limit_waits": rate_limit_waits,
+        "calls": dict(Counter(_worker_router.call_counts) - calls_before),
+        "prompt_tokens": estimate_tokens(prompt),
+    }
+    if parsed:
+        res.update({
+            "model": _worker_router.model_id(backend_name),
+            "match_score": parsed.match_score,
+            "likelihood_score": parsed.likelihood_score,
+            "reason": f"""Match Reason: {parsed.match_reason}\n\nLikelihood Reason: {parsed.likelihood_reason}""",
+        })
+    return res
 
-    if not parsed:
+
+def process_job(job):
+    job_desc = job.get("description")
+    if not job_desc:
         return None
 
-    try:
-        return {
-            "job_id": job["job_id"],
-            "match_score": int(parsed["match_score"]),
-            "likelihood_score": int(parsed["likelihood_score"]),
-            "reason": f"""Match Reason: {parsed["match_reason"]}\n\nLikelihood Reason: {parsed["likelihood_reason"]}"""
+    # Compacted once and shared by every profile the job is scored for
+    job_desc, tokens_saved = compact_job_description(job_desc, max_tokens=_worker_settings["max_description_tokens"])
+
+    results = []
+    for profile_id in job["profile_ids"]:
+        candidate = _worker_profiles[profile_id]
+        prompt = build_prompt(candidate["profile"], job_desc, candidate["resume_text"])
+        res = rate_prompt(job["job_id"], prompt)
+        res.update({"job_id": job["job_id"], "profile_id": profile_id, "tokens_saved": tokens_saved})
+        results.append(res)
+    return results
+
+
+def profile_fingerprints(profiles):
+    return {profile_id: candidate["fingerprints"] for profile_id, candidate in profiles.items()}
+
+
+def _relevance_document(title, description):
+    # Titles are repeated so they weigh more than the body of the description
+    return f"{title or ''}\n{title or ''}\n{strip_boilerplate(description or '')}"
+
+
+def fit_relevance_idf():
+    # Term weights come from every job that passed the filters, not just the jobs being ranked
+    return fit_idf([_relevance_document(title, description) for title, description in repo.get_job_texts()])
+
+
+def prefilter_jobs(config, profiles, job_ids=None, stale=False, idf=None):
+    # Every (job, profile) pair still waiting for a score, so a newly added profile's backlog is ranked too.
+    # job_ids limits the ranking to one batch of new jobs; stale ranks the pairs whose scores went stale instead.
+    # idf is a fit_relevance_idf() result to reuse across batches; it is fitted here when not given.
+    primary_profile_id = next(iter(profiles))
+    if stale:
+        jobs = repo.get_stale_scores(profile_fingerprints(profiles), routed_model_ids(config), limit=None)
+    else:
+        jobs = repo.get_pending_scores(list(profiles), primary_profile_id, limit=None, job_ids=job_ids)
+    if not jobs:
+        return
+    kind = "stale" if stale else "unscored"
+
+    search_titles = config.get("search_criteria", {}).get("job_titles", [])
+    # One query covers every profile, so a job relevant to any candidate ranks well
+    query = "\n".join([
+        *search_titles,
+        *(f"{candidate['profile'] or ''}\n{candidate['resume_text'] or ''}" for candidate in profiles.values()),
+    ])
+    documents = [_relevance_document(job["job_title"], job["description"]) for job in jobs]
+    scores = relevance_scores(query, documents, fit_relevance_idf() if idf is None else idf)
+    repo.update_relevance_scores({job["job_id"]: float(score) for job, score in zip(jobs, scores)})
+
+    relevance_config = config.get("relevance", {})
+    threshold = relevance_config.get("threshold", 0.05)
+    below = [(job, float(score)) for job, score in zip(jobs, scores) if score < threshold]
+    if relevance_config.get("action", "deprioritize") != "auto_score":
+        print(f"Ranked {len(jobs)} {kind} jobs by relevance; {len(below)} below threshold {threshold} "
+              f"will be scored last.")
+        return
+
+    low_score = relevance_config.get("low_score", 0)
+    reasons = {job["job_id"]: f"Auto-scored: relevance {score:.3f} is below the threshold of {threshold}; "
+                              f"not sent to the LLM." for job, score in below}
+    # Only the pending or stale pairs get a prefilter score; fresh scores are never overwritten
+    repo.bulk_update_job_scores([
+        (job["job_id"], low_score, low_score, reasons[job["job_id"]])
+        for job, _ in below if primary_profile_id in job["profile_ids"]
+    ])
+    repo.insert_scores([
+        (job["job_id"], profile_id, "relevance-prefilter", low_score, low_score, reasons[job["job_id"]], None, None,
+         profiles[profile_id]["fingerprints"]["profile"], profiles[profile_id]["fingerprints"]["resume"])
+        for job, _ in below
+        for profile_id in job["profile_ids"]
+    ])
+    print(f"Ranked {len(jobs)} {kind} jobs by relevance; auto-scored {len(below)} below threshold {threshold}.")
+
+
+def new_stats():
+    return {"scored": 0, "failed": 0, "latencies": [], "retries": 0, "rate_limit_waits": 0, "calls": Counter()}
+
+
+def prepare_resume_text(resume_text, max_tokens=2000):
+    resume_text, resume_tokens_saved = compact_resume(resume_text, max_tokens=max_tokens)
+    if resume_tokens_saved:
+        print(f"Compacted resume, saving ~{resume_tokens_saved} tokens per job.")
+    return resume_text
+
+
+def prepare_profiles(config, profiles):
+    max_resume_tokens = config.get("compaction", {}).get("max_resume_tokens", 2000)
+    prepared = {}
+    for profile_id, candidate in profiles.items():
+        resume_text = prepare_resume_text(candidate["resume_text"], max_tokens=max_resume_tokens)
+        # Provenance of every score; a change to any input makes the older scores stale
+        fingerprints = {
+            "prompt": fingerprint(PROMPT_TEMPLATE),
+            "profile": fingerprint(candidate["profile"]),
+            "resume": fingerprint(resume_text),
         }
-    except KeyError as e:
-        print(f"Missing expected key {e} for job {job['job_id']}")
-        print(f"Response: {parsed}")
-        return None
+        prepared[profile_id] = {**candidate, "resume_text": resume_text, "fingerprints": fingerprints}
+    return prepared
 
 
-def score_jobs(profile, resume_text, batch_size=5):
-    num_workers = min(cpu_count() - 1, batch_size)
-    print(f"Using {num_workers} workers for job scoring.")
+def routed_model_ids(config):
+    router = BackendRouter(config)
+    return [router.model_id(name) for name in router.names]
+
+
+def open_scoring_pool(config, profiles, num_workers):
+    router = BackendRouter(config)
+    print(f"Routing scoring requests to: {', '.join(router.names)} ({router.strategy}).")
+    return Pool(processes=num_workers, initializer=_init_worker,
+                initargs=(profiles, router, scoring_settings(config)))
+
+
+def score_batch(pool, jobs, stats, profiles):
+    primary_profile_id = next(iter(profiles))
+    failed = []
+    results = pool.map(process_job, jobs)
+    metrics.record(jobs_processed=len(jobs))
+
+    for job, job_results in zip(jobs, results):
+        if job_results is None:
+            failed.extend((job["job_id"], profile_id) for profile_id in job["profile_ids"])
+            stats["failed"] += len(job["profile_ids"])
+            continue
+
+        for res in job_results:
+            stats["latencies"].append(res["latency"])
+            stats["retries"] += res["retries"]
+            stats["rate_limit_waits"] += res["rate_limit_waits"]
+            stats["calls"].update(res["calls"])
+            metrics.record(llm_calls=sum(res["calls"].values()), prompt_tokens=res["prompt_tokens"],
+                           tokens_saved=res["tokens_saved"], errors=0 if res["scored"] else 1)
+            if not res["scored"]:
+                failed.append((res["job_id"], res["profile_id"]))
+                stats["failed"] += 1
+                continue
+
+            stats["scored"] += 1
+            fingerprints = profiles[res["profile_id"]]["fingerprints"]
+            repo.insert_scores([(res["job_id"], res["profile_id"], res["model"], res["match_score"],
+                                 res["likelihood_score"], res["reason"], res["tokens_saved"], fingerprints["prompt"],
+                                 fingerprints["profile"], fingerprints["resume"])])
+            # The primary profile's scores stay on the jobs table for the sheet and exports
+            if res["profile_id"] == primary_profile_id:
+                repo.update_job_scores(
+                    job_id=res["job_id"],
+                    match_score=res["match_score"],
+                    likelihood_score=res["likelihood_score"],
+                    match_reason=res["reason"],
+                    tokens_saved=res["tokens_saved"]
+                )
+            print(
+                f"Scored job {res['job_id']} for {res['profile_id']} — match_score: {res['match_score']}, "
+                f"likelihood_score: {res['likelihood_score']}, tokens_saved: {res['tokens_saved']}")
+    return failed
 
+
+def default_workers(batch_size):
+    return max(min(cpu_count() - 1, batch_size), 1)
+
+
+def score_pending_jobs(config, pool, profiles, batch_size, stats, stale=False):
+    primary_profile_id = next(iter(profiles))
+    if stale:
+        fingerprints = profile_fingerprints(profiles)
+        model_ids = routed_model_ids(config)
+    # (job, profile) pairs that failed in this run are not retried until the next run
+    failed = set()
     while True:
-        jobs = repo.get_unscored_jobs(limit=batch_size)
+        if stale:
+            jobs = repo.get_stale_scores(fingerprints, model_ids, limit=batch_size, exclude=failed)
+        else:
+            jobs = repo.get_pending_scores(list(profiles), primary_profile_id, limit=batch_size, exclude=failed)
         if not jobs:
             break
 
-        with Pool(processes=num_workers) as pool:
-            job_args = [(job, profile, resume_text) for job in jobs]
-            results = pool.map(process_job, job_args)
+        failed.update(score_batch(pool, jobs, stats, profiles))
+    return stats
 
-        for res in results:
-            if not res:
-                continue
-            repo.update_job_scores(
-                job_id=res["job_id"],
-                match_score=res["match_score"],
-                likelihood_score=res["likelihood_score"],
-                match_reason=res["reason"]
-            )
-            print(
-                f"Scored job {res['job_id']} — match_score: {res['match_score']}, likelihood_score: {res['likelihood_score']}")
+
+def rescore_stale_jobs(config, profiles, batch_size=5, workers=None):
+    num_workers = workers or default_workers(batch_size)
+    profiles = prepare_profiles(config, profiles)
+    for profile_id, candidate in profiles.items():
+        print(f"Current fingerprints for {profile_id}: " +
+              ", ".join(f"{name} {value}" for name, value in candidate["fingerprints"].items()))
+
+    # Stale pairs that are still irrelevant under the new inputs are auto-scored again instead of sent to the LLM
+    if config.get("relevance", {}).get("enabled", False):
+        prefilter_jobs(config, profiles, stale=True)
+
+    stats = new_stats()
+    with open_scoring_pool(config, profiles, num_workers) as pool:
+        score_pending_jobs(config, pool, profiles, batch_size, stats, stale=True)
+
+    print(f"Re-scored {stats['scored']} stale job/profile pairs, {stats['failed']} failed.")
+    return stats
+
+
+def score_jobs(config, profiles, batch_size=5, workers=None):
+    num_workers = workers or default_workers(batch_size)
+    print(f"Using {num_workers} workers for job scoring.")
+    for profile_id, candidate in profiles.items():
+        if candidate.get("resume_fingerprint"):
+            print(f"Resume fingerprint for {profile_id}: {candidate['resume_fingerprint']}")
+
+    profiles = prepare_profiles(config, profiles)
+
+    if config.get("relevance", {}).get("enabled", False):
+        prefilter_jobs(config, profiles)
+
+    stats = new_stats()
+    with open_scoring_pool(config, profiles, num_workers) as pool:
+        score_pending_jobs(config, pool, profiles, batch_size, stats)
+
+    print(f"Scored {stats['scored']} job/profile pairs for {len(profiles)} profiles, {stats['failed']} failed.")
+    return stats
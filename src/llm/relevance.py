@@ -0,0 +1,65 @@
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9+#]*")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his how
+i if in into is it its itself just me more most my no nor not of off on once only or other our ours out over own
+per same she should so some such than that the their theirs them then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you your yours
+job role team work working position candidate candidates company experience ability skills year years
+""".split())
+
+
+def tokenize(text):
+    return [word for word in _WORD_RE.findall((text or "").lower()) if len(word) > 1 and word not in STOPWORDS]
+
+
+def fit_idf(documents):
+    # Document count and per-term document frequencies of a corpus; documents weighted against the same fit
+    # score the same whichever documents they are ranked with
+    return len(documents), Counter(term for document in documents for term in set(tokenize(document)))
+
+
+def tfidf_matrix(documents, idf=None):
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    data = []
+    for document in documents:
+        for term, count in Counter(tokenize(document)).items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(1.0 + math.log(count))
+        indptr.append(len(indices))
+
+    matrix = csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(documents), len(vocabulary)),
+    )
+
+    if idf is None:
+        document_count = len(documents)
+        document_frequency = np.bincount(matrix.indices, minlength=len(vocabulary))
+    else:
+        document_count, frequencies = idf
+        document_frequency = np.fromiter((frequencies.get(term, 0) for term in vocabulary), dtype=np.float64,
+                                         count=len(vocabulary))
+    weights = np.log((1.0 + document_count) / (1.0 + document_frequency)) + 1.0
+    matrix = matrix @ diags(weights)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (diags(1.0 / norms) @ matrix).tocsr()
+
+
+def relevance_scores(query_text, documents, idf=None):
+    if not documents:
+        return np.zeros(0)
+    matrix = tfidf_matrix([query_text, *documents], idf)
+    return np.asarray((matrix[1:] @ matrix[0].T).todense()).ravel()
@@ -0,0 +1,135 @@
+import importlib
+import random
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.llm.streaming import deadline_after
+from src.utils.rate_limit import RateLimitError, TokenBucket
+
+# Imported on first use so only the SDKs of the routed backends are loaded
+BACKENDS = {
+    "ollama": "src.llm.backends.ollama_chat",
+    "openrouter": "src.llm.backends.openrouter_chat",
+    "gemini": "src.llm.backends.gemini_chat",
+}
+
+
+def load_backend(name):
+    return importlib.import_module(BACKENDS[name])
+
+
+class BackendRouter:
+    def __init__(self, config):
+        self.config = config
+        routing_config = config.get("routing", {})
+        self.strategy = routing_config.get("strategy", "failover")
+        self.names = routing_config.get("backends") or [config.get("backend", "ollama")]
+
+        unsupported = [name for name in self.names if name not in BACKENDS]
+        if unsupported:
+            raise ValueError(f"Unsupported backend: {', '.join(unsupported)}")
+        if self.strategy not in ("failover", "weighted"):
+            raise ValueError(f"Unsupported routing strategy: {self.strategy}")
+
+        request_config = config.get("llm_requests", {})
+        self.request_timeout = request_config.get("timeout", 120)
+        self.hedge_after = request_config.get("hedge_after")
+
+        self.weights = {name: config.get(name, {}).get("weight", 1) for name in self.names}
+        self.buckets = {
+            name: TokenBucket(config.get(name, {}).get("requests_per_minute"))
+            for name in self.names
+        }
+        self.rate_limit_counts = {name: 0 for name in self.names}
+        # Outcomes per "backend:outcome", used for retry and error reporting
+        self.call_counts = Counter()
+        self.backend_settings = {}
+
+    def settings(self, name):
+        # Resolved on first use, like the backend module itself
+        if name not in self.backend_settings:
+            self.backend_settings[name] = load_backend(name).load_settings(self.config)
+        return self.backend_settings[name]
+
+    def model_id(self, name):
+        return f"{name}/{self.settings(name)['model']}"
+
+    def _candidates(self):
+        waits = {name: self.buckets[name].wait_time() for name in self.names}
+        available = [name for name in self.names if waits[name] == 0]
+        waiting = sorted((name for name in self.names if waits[name] > 0), key=waits.get)
+
+        if self.strategy == "weighted" and len(available) > 1:
+            ordered = []
+            pool = list(available)
+            while pool:
+                name = random.choices(pool, weights=[self.weights[n] for n in pool])[0]
+                ordered.append(name)
+                pool.remove(name)
+            available = ordered
+        return available + waiting
+
+    def _call(self, name, prompt, cancel_event=None):
+        bucket = self.buckets[name]
+        bucket.acquire()
+        try:
+            result = load_backend(name).generate(self.settings(name), prompt,
+                                                 deadline=deadline_after(self.request_timeout),
+                                                 cancel_event=cancel_event)
+        except RateLimitError as e:
+            self.call_counts[f"{name}:rate_limited"] += 1
+            self.rate_limit_counts[name] += 1
+            bucket.record_rate_limited(e.retry_after, attempt=self.rate_limit_counts[name])
+            print(f"Backend '{name}' rate limited (retry after {e.retry_after}s).")
+            raise
+        except Exception:
+            self.call_counts[f"{name}:error"] += 1
+            raise
+
+        self.call_counts[f"{name}:ok"] += 1
+        self.rate_limit_counts[name] = 0
+        bucket.record_success()
+        return name, result
+
+    def _generate_hedged(self, candidates, prompt):
+        # Start the next backend if the first is slow or fails; the first answer wins
+        cancel_event = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=2)
+        pending = {executor.submit(self._call, candidates[0], prompt, cancel_event)}
+        hedged = False
+        last_error = None
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=None if hedged else self.hedge_after,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        print(f"Backend request failed: {e}")
+                        last_error = e
+                if not hedged:
+                    hedged = True
+                    if pending:
+                        print(f"No response after {self.hedge_after}s, hedging with '{candidates[1]}'.")
+                    pending.add(executor.submit(self._call, candidates[1], prompt, cancel_event))
+        finally:
+            cancel_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise last_error
+
+    def generate(self, prompt):
+        candidates = self._candidates()
+        if self.hedge_after and len(candidates) > 1:
+            return self._generate_hedged(candidates, prompt)
+
+        last_error = None
+        for name in candidates:
+            try:
+                return self._call(name, prompt)
+            except Exception as e:
+                if not isinstance(e, RateLimitError):
+                    print(f"Backend '{name}' failed: {e}")
+                last_error = e
+        raise last_error
@@ -0,0 +1,61 @@
+import time
+
+from src.llm.parsing import find_complete_object, parse_rater_response, strip_thinking
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+def deadline_after(timeout):
+    return time.monotonic() + timeout if timeout else None
+
+
+class RatingStream:
+    def __init__(self):
+        self.parts = []
+        self.rating = None
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def feed(self, piece):
+        self.parts.append(piece)
+        if "}" not in piece:
+            return False
+
+        text = self.text
+        lowered = text.lower()
+        think_start = lowered.rfind("<think>")
+        if think_start != -1 and lowered.find("</think>", think_start) == -1:
+            return False
+
+        # Only a balanced object that validates strictly ends the stream early,
+        # otherwise a "}" inside a string could cut the answer short
+        candidate = find_complete_object(strip_thinking(text))
+        if candidate:
+            self.rating = parse_rater_response(candidate, repair=False)
+        return self.rating is not None
+
+
+def collect_stream(stream, chunk_text, deadline=None, cancel_event=None):
+    rating_stream = RatingStream()
+    try:
+        for chunk in stream:
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelled("Request cancelled")
+            if deadline is not None and time.monotonic() > deadline:
+                raise DeadlineExceeded("Request deadline exceeded")
+            piece = chunk_text(chunk)
+            if piece and rating_stream.feed(piece):
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+    return rating_stream.text
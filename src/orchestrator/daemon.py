@@ -0,0 +1,208 @@
+import json
+import logging
+import signal
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.llm import rater
+from src.orchestrator.job_scraper import connect_to_existing_browser, search_jobs
+from src.sheets.manager import open_sheet, sync_jobs_to_sheet
+from src.utils import metrics
+from src.utils.locks import stage_lock
+from src.utils.profiling import profile_stage
+
+logger = logging.getLogger("daemon")
+
+
+class Daemon:
+    def __init__(self, config, profiles, profile_mode=None):
+        self.config = config
+        daemon_config = config.get("daemon", {})
+        self.intervals = {
+            "crawl": daemon_config.get("crawl_interval", 3600),
+            "score": daemon_config.get("score_interval", 600),
+            "sync": daemon_config.get("sync_interval", 300),
+        }
+        self.health_host = daemon_config.get("health_host", "127.0.0.1")
+        self.health_port = daemon_config.get("health_port", 8765)
+        self.score_batch_size = daemon_config.get("score_batch_size", 5)
+        self.profiles = rater.prepare_profiles(config, profiles)
+        self.profile_mode = profile_mode
+        self.stop_event = threading.Event()
+        self.started_at = time.time()
+        self.stages = {
+            "crawl": self.run_crawl,
+            "score": self.run_score,
+            "sync": self.run_sync,
+        }
+        self.next_run = {stage: 0.0 for stage in self.stages}
+        self.metrics = {stage: {"runs": 0, "failures": 0, "skipped": 0, "items": 0, "last_duration": None,
+                                "last_started": None, "last_status": None} for stage in self.stages}
+        self.lock = threading.Lock()
+        # Warm resources, opened on first use and reopened after a failure
+        self.pool = None
+        self.playwright = None
+        self.page = None
+        self.sheet = None
+
+    def _stop_playwright(self):
+        # A second sync_playwright() cannot start on this thread while the previous one is running
+        self.page = None
+        if self.playwright is not None:
+            try:
+                self.playwright.stop()
+            except Exception as e:
+                logger.warning(f"Failed to stop Playwright: {e}")
+            self.playwright = None
+
+    def run_crawl(self):
+        if self.page is None or self.page.is_closed():
+            self._stop_playwright()
+            self.playwright, _, _, self.page = connect_to_existing_browser()
+            if self.page is None:
+                raise RuntimeError("Could not connect to browser")
+
+        inserted = []
+        search_jobs(self.config, on_job_inserted=inserted.append, page=self.page)
+        return len(inserted)
+
+    def run_score(self):
+        if self.pool is None:
+            self.pool = rater.open_scoring_pool(self.config, self.profiles,
+                                                rater.default_workers(self.score_batch_size))
+        if self.config.get("relevance", {}).get("enabled", False):
+            rater.prefilter_jobs(self.config, self.profiles)
+        stats = rater.score_pending_jobs(self.config, self.pool, self.profiles, self.score_batch_size,
+                                         rater.new_stats())
+        return stats["scored"]
+
+    def run_sync(self):
+        if self.sheet is None:
+            self.sheet = open_sheet(self.config)
+        written = sync_jobs_to_sheet(self.config, sheet=self.sheet)
+        if written is None:
+            raise RuntimeError("Sheet sync failed")
+        return written
+
+    def _reset(self, stage):
+        if stage == "crawl":
+            self._stop_playwright()
+        elif stage == "score" and self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+        elif stage == "sync":
+            self.sheet = None
+
+    def run_stage(self, stage):
+        stage_metrics = self.metrics[stage]
+        with stage_lock(stage) as acquired:
+            if not acquired:
+                logger.info(f"Skipping {stage}: another process is running it.")
+                with self.lock:
+                    stage_metrics["skipped"] += 1
+                return
+
+            started_at = datetime.now().isoformat()
+            started = time.monotonic()
+            with self.lock:
+                stage_metrics["last_started"] = started_at
+            metrics.reset()
+            with profile_stage(f"daemon-{stage}", self.profile_mode) as profile_path:
+                try:
+                    items = self.stages[stage]()
+                    status = "ok"
+                except Exception as e:
+                    logger.error(f"Daemon {stage} run failed: {e}", exc_info=True)
+                    metrics.record(errors=1)
+                    self._reset(stage)
+                    items = 0
+                    status = "error"
+            duration = time.monotonic() - started
+            metrics.save_run(f"daemon:{stage}", started_at, duration, status, profile_path)
+
+        with self.lock:
+            stage_metrics["runs"] += 1
+            stage_metrics["failures"] += 1 if status == "error" else 0
+            stage_metrics["items"] += items
+            stage_metrics["last_duration"] = duration
+            stage_metrics["last_status"] = status
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "status": "stopping" if self.stop_event.is_set() else "running",
+                "uptime": time.time() - self.started_at,
+                "stages": {stage: {**stage_metrics, "next_run_in": max(self.next_run[stage] - time.monotonic(), 0)}
+                           for stage, stage_metrics in self.metrics.items()},
+            }
+
+    def run(self):
+        server = start_health_server(self, self.health_host, self.health_port)
+        logger.info(f"Daemon health endpoint on http://{self.health_host}:{server.server_address[1]}/health")
+        try:
+            while not self.stop_event.is_set():
+                # Stages run one at a time in this thread; Playwright objects must stay on the thread that made them
+                for stage in self.stages:
+                    if self.stop_event.is_set():
+                        break
+                    if time.monotonic() >= self.next_run[stage]:
+                        self.run_stage(stage)
+                        self.next_run[stage] = time.monotonic() + self.intervals[stage]
+                self.stop_event.wait(max(min(self.next_run.values()) - time.monotonic(), 0))
+        finally:
+            server.shutdown()
+            server.server_close()
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+            self._stop_playwright()
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+
+def format_metrics(snapshot):
+    lines = [f"job_hunter_daemon_uptime_seconds {snapshot['uptime']:.0f}"]
+    for stage, stage_metrics in snapshot["stages"].items():
+        for name in ("runs", "failures", "skipped", "items"):
+            lines.append(f'job_hunter_stage_{name}_total{{stage="{stage}"}} {stage_metrics[name]}')
+        if stage_metrics["last_duration"] is not None:
+            lines.append(f'job_hunter_stage_last_duration_seconds{{stage="{stage}"}} '
+                         f'{stage_metrics["last_duration"]:.3f}')
+    return "\n".join(lines) + "\n"
+
+
+def start_health_server(daemon, host, port):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type):
+            payload = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, json.dumps(daemon.snapshot()), "application/json")
+            elif self.path == "/metrics":
+                self._send(200, format_metrics(daemon.snapshot()), "text/plain; version=0.0.4")
+            else:
+                self._send(404, json.dumps({"error": f"Unknown path {self.path}"}), "application/json")
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_daemon(config, profiles, profile_mode=None):
+    daemon = Daemon(config, profiles, profile_mode=profile_mode)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run()
@@ -6,20 +6,12 @@ import urllib.parse
 
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+from src.db.normalize import load_filter_rules
 from src.db.repository import JobRepository
-from src.utils.helpers import get_config
+from src.utils import metrics
 
 repo = JobRepository()
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("scraper.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("indeed_scraper")
 
 
@@ -68,8 +60,9 @@ def extract_job_details_from_right_pane(page, job_id, title_from_card_left_pane)
         if not title_elem:  # Fallback to the h2 itself
             title_elem = page.query_selector(
                 f'{right_pane_selector_prefix}h2[data-testid="jobsearch-JobInfoHeader-title"], {right_pane_selector_prefix}h2.jobsearch-JobInfoHeader-title')
-        details["title_right_pane"] = title_elem.inner_text().strip(
-            "-job post").strip() if title_elem else title_from_card_left_pane
+        # The header ends with a "- job post" label
+        details["title_right_pane"] = re.sub(r"\s*-\s*job post\s*$", "", title_elem.inner_text()).strip() \
+            if title_elem else title_from_card_left_pane
 
         # Company Name
         company_elem = page.query_selector(f'{right_pane_selector_prefix}div[data-testid="inlineHeader-companyName"] a')
@@ -102,13 +95,17 @@ def extract_job_details_from_right_pane(page, job_id, title_from_card_left_pane)
                 location_text = location_section_elem.inner_text().strip()
         details["location"] = location_text
 
-        # Pay
+        # Pay and job type share a header line: "<pay> - <job type>", either part may be missing
         pay_text = None
+        combo_job_type_text = None
         salary_info_type_combo_elem = page.query_selector(f'{right_pane_selector_prefix}div#salaryInfoAndJobType')
         if salary_info_type_combo_elem:
-            pay_span_elem = salary_info_type_combo_elem.query_selector('span')
-            if pay_span_elem:
-                pay_text = pay_span_elem.inner_text().strip()
+            combo_texts = [span.inner_text().strip() for span in salary_info_type_combo_elem.query_selector_all('span')]
+            combo_texts = [text for text in combo_texts if text]
+            if combo_texts and any(char.isdigit() for char in combo_texts[0]):
+                pay_text = combo_texts.pop(0)
+            if combo_texts:
+                combo_job_type_text = combo_texts[0].lstrip("-\u00a0 ").strip()
 
         if not pay_text:  # Try #jobDetailsSection
             job_details_section = page.query_selector(f'{right_pane_selector_prefix}div#jobDetailsSection')
@@ -120,17 +117,7 @@ def extract_job_details_from_right_pane(page, job_id, title_from_card_left_pane)
         details["pay"] = pay_text
 
         # Job Type
-        job_type_text = None
-        if salary_info_type_combo_elem:
-            job_type_span_elem = salary_info_type_combo_elem.query_selector('span')
-            if job_type_span_elem:
-                job_type_text = job_type_span_elem.inner_text().strip().replace("-", "").strip()
-            elif details["pay"]:  # If pay was in combo, try to deduce job type
-                full_combo_text = salary_info_type_combo_elem.inner_text().strip()
-                if full_combo_text.startswith(details["pay"]):
-                    potential_job_type = full_combo_text[len(details["pay"]):].strip()
-                    if potential_job_type.startswith("-"):
-                        job_type_text = potential_job_type[1:].strip()
+        job_type_text = combo_job_type_text
 
         if not job_type_text:  # Try #jobDetailsSection
             job_details_section = page.query_selector(f'{right_pane_selector_prefix}div#jobDetailsSection')
@@ -185,13 +172,13 @@ def extract_job_details_from_right_pane(page, job_id, title_from_card_left_pane)
         return details
 
 
-def search_jobs():
-    config = get_config()
+def search_jobs(config, on_job_inserted=None, page=None):
     criteria = config.get("search_criteria", {})
     job_titles_search = criteria.get("job_titles", [])
     locations_search = criteria.get("locations", [])
     salary_min = criteria.get("salary_min", None)
     job_types = criteria.get("job_types", [])
+    filter_rules = load_filter_rules(config)
 
     fromsalary_map = {
         "60000": "$60,000+",
@@ -210,7 +197,8 @@ def search_jobs():
     }
     job_types = [job_types_map.get(job_type, None) for job_type in job_types]
 
-    playwright, browser, context, page = connect_to_existing_browser()
+    if page is None:
+        playwright, browser, context, page = connect_to_existing_browser()
     if not page:
         logger.error("Could not connect to browser. Aborting.")
         return []
@@ -450,8 +438,11 @@ def search_jobs():
                         job_details_data["job_url"] = job_url
                         processed_job_ids_global.add(job_jk)
                         try:
-                            repo.insert_job(job_details_data)
+                            repo.insert_job(job_details_data, filter_rules=filter_rules)
                             logger.info(f"Inserted job '{job_details_data.get('title_right_pane')}' into database.")
+                            metrics.record(jobs_processed=1)
+                            if on_job_inserted:
+                                on_job_inserted(job_jk)
                         except Exception as db_err:
                             logger.error(f"Failed to insert job into database: {db_err}")
                     random_delay('m')
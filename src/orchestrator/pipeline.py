@@ -0,0 +1,132 @@
+import logging
+import queue
+import threading
+import time
+
+from src.db.repository import JobRepository
+from src.llm import rater
+from src.orchestrator.job_scraper import search_jobs
+from src.sheets.manager import open_sheet, sync_jobs_to_sheet
+
+logger = logging.getLogger("pipeline")
+
+repo = JobRepository()
+
+# Sent down the queues when the upstream stage has finished
+_DONE = object()
+
+
+def _next_batch(source, max_items, max_wait):
+    # Blocks for the first item, then gathers more until the batch is full or max_wait has passed
+    first = source.get()
+    if first is _DONE:
+        return [], True
+
+    batch = [first]
+    deadline = time.monotonic() + max_wait
+    while len(batch) < max_items:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            break
+        try:
+            item = source.get(timeout=timeout)
+        except queue.Empty:
+            break
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+def _crawl_stage(config, scoring_queue):
+    try:
+        # put() blocks while the scoring queue is full, which holds the crawler back
+        search_jobs(config, on_job_inserted=scoring_queue.put)
+    except Exception as e:
+        logger.error(f"Crawl stage failed: {e}", exc_info=True)
+    finally:
+        scoring_queue.put(_DONE)
+
+
+def _score_stage(config, pool, profiles, scoring_queue, sync_queue, stats):
+    pipeline_config = config.get("pipeline", {})
+    batch_size = pipeline_config.get("score_batch_size", 5)
+    max_wait = pipeline_config.get("score_max_wait", 5)
+    relevance_enabled = config.get("relevance", {}).get("enabled", False)
+    primary_profile_id = next(iter(profiles))
+    # Fitted once, when the first batch arrives, so every batch is ranked against the same term weights
+    idf = None
+    try:
+        done = False
+        while not done:
+            job_ids, done = _next_batch(scoring_queue, batch_size, max_wait)
+            if not job_ids:
+                continue
+            try:
+                if relevance_enabled:
+                    if idf is None:
+                        idf = rater.fit_relevance_idf()
+                    # Only this batch is ranked; the rest of the backlog is left to --score-jobs
+                    rater.prefilter_jobs(config, profiles, job_ids=job_ids, idf=idf)
+                jobs = repo.get_pending_scores(list(profiles), primary_profile_id, limit=None, job_ids=job_ids)
+                if jobs:
+                    rater.score_batch(pool, jobs, stats, profiles)
+            except Exception as e:
+                logger.error(f"Scoring batch failed: {e}", exc_info=True)
+            for job_id in job_ids:
+                sync_queue.put(job_id)
+    finally:
+        sync_queue.put(_DONE)
+
+
+def _sync_stage(config, sync_queue, stats):
+    pipeline_config = config.get("pipeline", {})
+    batch_size = pipeline_config.get("sync_batch_size", 25)
+    interval = pipeline_config.get("sync_interval", 30)
+    # One sheet handle serves every batch; it is reopened only after a failed sync
+    sheet = None
+    done = False
+    while not done:
+        job_ids, done = _next_batch(sync_queue, batch_size, interval)
+        if not job_ids:
+            continue
+        written = None
+        try:
+            if sheet is None:
+                sheet = open_sheet(config)
+            written = sync_jobs_to_sheet(config, job_ids=job_ids, sheet=sheet)
+        except Exception as e:
+            logger.error(f"Sheet sync failed: {e}", exc_info=True)
+        if written is None:
+            stats["sync_failures"] += 1
+            sheet = None
+        else:
+            stats["synced"] += written
+
+
+def run_pipeline(config, profiles, workers=None):
+    pipeline_config = config.get("pipeline", {})
+    queue_size = pipeline_config.get("queue_size", 50)
+    profiles = rater.prepare_profiles(config, profiles)
+    num_workers = workers or pipeline_config.get("score_batch_size", 5)
+    scoring_queue = queue.Queue(maxsize=queue_size)
+    sync_queue = queue.Queue(maxsize=queue_size)
+    stats = {**rater.new_stats(), "synced": 0, "sync_failures": 0}
+    started = time.monotonic()
+
+    # The pool is forked before any stage thread starts
+    with rater.open_scoring_pool(config, profiles, num_workers) as pool:
+        stages = [
+            threading.Thread(target=_crawl_stage, args=(config, scoring_queue), name="crawl"),
+            threading.Thread(target=_score_stage, args=(config, pool, profiles, scoring_queue, sync_queue, stats),
+                             name="score"),
+            threading.Thread(target=_sync_stage, args=(config, sync_queue, stats), name="sync"),
+        ]
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+
+    print(f"Pipeline finished in {time.monotonic() - started:.0f}s: scored {stats['scored']} jobs, "
+          f"{stats['failed']} failed, synced {stats['synced']} rows, {stats['sync_failures']} sync batches failed.")
+    return stats
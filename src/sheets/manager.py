@@ -1,3 +1,6 @@
+import hashlib
+import json
+import re
 import time
 from datetime import datetime
 
@@ -5,72 +8,158 @@ import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
 from src.db.repository import JobRepository
-from src.utils.helpers import get_config
+from src.utils import metrics
+from src.utils.rate_limit import backoff_delay, retry_after_from_headers
 
-config = get_config()
-google_sheet_config = config.get("google_sheet")
-keys_path = google_sheet_config.get("credential_path")
-sheet_name = google_sheet_config.get("sheet_name")
 repo = JobRepository()
 
 
-def sync_jobs_to_sheet():
+def sheet_settings(config):
+    google_sheet_config = config.get("google_sheet") or {}
+    return {
+        "credential_path": google_sheet_config.get("credential_path"),
+        "sheet_name": google_sheet_config.get("sheet_name"),
+        "batch_rows": google_sheet_config.get("batch_rows", 500),
+        # The Sheets API rejects request bodies over ~2 MB; stay well below it
+        "batch_bytes": google_sheet_config.get("batch_bytes", 1_500_000),
+        "max_backoff_attempts": google_sheet_config.get("max_backoff_attempts", 6),
+    }
+
+
+def _chunks(items, row_of, settings):
+    chunk = []
+    chunk_bytes = 0
+    for item in items:
+        size = len(json.dumps(row_of(item)))
+        if chunk and (len(chunk) >= settings["batch_rows"] or chunk_bytes + size > settings["batch_bytes"]):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(item)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def _with_backoff(settings, request, *args, **kwargs):
+    max_backoff_attempts = settings["max_backoff_attempts"]
+    attempt = 0
     while True:
         try:
-            print(f"Syncing jobs to Google Sheet '{sheet_name}'...")
-            scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-            creds = ServiceAccountCredentials.from_json_keyfile_name(keys_path, scope)
-            client = gspread.authorize(creds)
-
-            sheet = client.open(sheet_name).sheet1
-            headers, rows = repo.get_jobs_for_sheet()
-
-            existing = sheet.get_all_records()
-
-            if not existing:
-                sheet.insert_row(headers, 1)
-
-            job_index_map = {row['job_id']: (idx + 2, row.get('last_synced')) for idx, row in enumerate(existing)}
-
-            for row in rows:
-                job_id = str(row[0])
-                row_data = list(map(str, row))
-
-                date_updated_str = row_data[-1]  # Assume date_updated is last field in row
-                date_updated = datetime.fromisoformat(date_updated_str)
-
-                now_iso = datetime.now().isoformat()
-                row_data[-2] = now_iso
-
-                if job_id in job_index_map:
-                    row_num, sheet_synced_str = job_index_map[job_id]
-
-                    try:
-                        if sheet_synced_str:
-                            sheet_last_synced = datetime.fromisoformat(sheet_synced_str)
-                        else:
-                            sheet_last_synced = datetime.min  # treat as never synced
-                    except ValueError:
-                        sheet_last_synced = datetime.min
-
-                    if date_updated > sheet_last_synced:
-                        end_cell = gspread.utils.rowcol_to_a1(row_num, len(row_data))
-                        sheet.update(f"A{row_num}:{end_cell}", [row_data])
-                        repo.update_last_synced(job_id)
-                else:
-                    sheet.append_row(row_data)
-                    repo.update_last_synced(job_id)
-
-            print(f"Synced {len(rows)} job entries to Google Sheet '{sheet_name}'.")
-            break
-        except gspread.exceptions.SpreadsheetNotFound:
-            print(f"Spreadsheet '{sheet_name}' not found. Please check the name and try again.")
-            break
+            return request(*args, **kwargs)
         except gspread.exceptions.APIError as e:
-            print(f"API error occurred: {e}")
-            if e.code == 429:
-                print("Rate limit exceeded. Retrying in 1 minute...")
-                time.sleep(65)
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
-            break
+            if e.code != 429 or attempt >= max_backoff_attempts:
+                raise
+            attempt += 1
+            delay = retry_after_from_headers(e.response.headers) or backoff_delay(attempt, base=4.0, cap=65.0)
+            print(f"Rate limit exceeded. Retrying in {delay:.0f}s (attempt {attempt}/{max_backoff_attempts})...")
+            time.sleep(delay)
+
+
+def _row_hash(row_data, skip_index):
+    # last_synced changes on every write, so it is not part of the content
+    content = [value for i, value in enumerate(row_data) if i != skip_index]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+def _appended_start_row(response, fallback):
+    updated_range = (response or {}).get("updates", {}).get("updatedRange", "")
+    match = re.search(r"[A-Z]+(\d+)", updated_range.split("!")[-1])
+    return int(match.group(1)) if match else fallback
+
+
+# Reads only the job_id column; the full sheet is downloaded only when the local mirror no longer matches it
+def _load_row_index(sheet, headers, settings):
+    sheet_name = settings["sheet_name"]
+    api_calls = 1
+    sheet_job_ids = [str(job_id) for job_id in _with_backoff(settings, sheet.col_values, 1)]
+    if not sheet_job_ids:
+        _with_backoff(settings, sheet.insert_row, headers, 1)
+        repo.replace_sheet_rows(sheet_name, [])
+        return {}, api_calls + 1
+
+    index = repo.get_sheet_rows(sheet_name)
+    mirrored_job_ids = [job_id for job_id, _ in sorted(index.items(), key=lambda item: item[1][0])]
+    expected_rows = [index[job_id][0] for job_id in mirrored_job_ids]
+    if mirrored_job_ids == sheet_job_ids[1:] and expected_rows == list(range(2, len(sheet_job_ids) + 1)):
+        metrics.record(cache_hits=1)
+        return index, api_calls
+
+    print("Local sheet index is out of date, rebuilding it from the sheet...")
+    values = _with_backoff(settings, sheet.get_all_values)
+    api_calls += 1
+    sheet_headers = values[0] if values else headers
+    skip_index = sheet_headers.index("last_synced") if "last_synced" in sheet_headers else -1
+    entries = [(str(row[0]), row_number, _row_hash(row, skip_index))
+               for row_number, row in enumerate(values[1:], start=2) if row and row[0]]
+    repo.replace_sheet_rows(sheet_name, entries)
+    return {job_id: (row_number, content_hash) for job_id, row_number, content_hash in entries}, api_calls
+
+
+def open_sheet(config):
+    settings = sheet_settings(config)
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+    creds = ServiceAccountCredentials.from_json_keyfile_name(settings["credential_path"], scope)
+    client = gspread.authorize(creds)
+    return client.open(settings["sheet_name"]).sheet1
+
+
+def sync_jobs_to_sheet(config, job_ids=None, sheet=None):
+    settings = sheet_settings(config)
+    sheet_name = settings["sheet_name"]
+    try:
+        print(f"Syncing jobs to Google Sheet '{sheet_name}'...")
+        if sheet is None:
+            sheet = open_sheet(config)
+        headers, rows = repo.get_jobs_for_sheet(job_ids)
+        last_synced_index = headers.index("last_synced")
+
+        row_index, api_calls = _load_row_index(sheet, headers, settings)
+        next_row = max((row_number for row_number, _ in row_index.values()), default=1) + 1
+
+        updates = []
+        appends = []
+        now_iso = datetime.now().isoformat()
+        for row in rows:
+            job_id = str(row[0])
+            row_data = list(map(str, row))
+            content_hash = _row_hash(row_data, last_synced_index)
+            row_data[last_synced_index] = now_iso
+
+            if job_id in row_index:
+                row_num, sheet_hash = row_index[job_id]
+                if content_hash != sheet_hash:
+                    end_cell = gspread.utils.rowcol_to_a1(row_num, len(row_data))
+                    updates.append((job_id, content_hash, row_num,
+                                    {"range": f"A{row_num}:{end_cell}", "values": [row_data]}))
+            else:
+                appends.append((job_id, content_hash, row_data))
+
+        # Each chunk is recorded as soon as it lands, so a failure only leaves later chunks pending
+        for chunk in _chunks(updates, lambda item: item[3]["values"], settings):
+            _with_backoff(settings, sheet.batch_update, [update for *_, update in chunk])
+            repo.upsert_sheet_rows(sheet_name, [(job_id, row_num, content_hash)
+                                                for job_id, content_hash, row_num, _ in chunk])
+            repo.mark_synced([job_id for job_id, *_ in chunk], now_iso)
+            api_calls += 1
+
+        for chunk in _chunks(appends, lambda item: item[2], settings):
+            response = _with_backoff(settings, sheet.append_rows, [row_data for *_, row_data in chunk])
+            start_row = _appended_start_row(response, next_row)
+            repo.upsert_sheet_rows(sheet_name, [(job_id, start_row + offset, content_hash)
+                                                for offset, (job_id, content_hash, _) in enumerate(chunk)])
+            repo.mark_synced([job_id for job_id, *_ in chunk], now_iso)
+            next_row = start_row + len(chunk)
+            api_calls += 1
+
+        print(f"Synced {len(rows)} job entries to Google Sheet '{sheet_name}' "
+              f"({len(updates)} updated, {len(appends)} appended, {api_calls} API calls).")
+        metrics.record(sheets_api_calls=api_calls, jobs_processed=len(updates) + len(appends))
+        return len(updates) + len(appends)
+    except gspread.exceptions.SpreadsheetNotFound:
+        print(f"Spreadsheet '{sheet_name}' not found. Please check the name and try again.")
+    except gspread.exceptions.APIError as e:
+        print(f"API error occurred: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    metrics.record(errors=1)
@@ -1,22 +1,139 @@
+import hashlib
+import json
+import logging
 import os
 
 import yaml
 from PyPDF2 import PdfReader
 
+from src.utils import metrics
+
+RESUME_CACHE_PATH = "db/resume_cache.json"
+
+
+def _extract_pdf_text(path):
+    reader = PdfReader(path)
+    pages = []
+    for page in reader.pages:
+        text = page.extract_text()
+        if text:
+            pages.append(text)
+    return "\n".join(pages)
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _list_pdf_files(dir):
+    return sorted(f for f in os.listdir(dir) if f.endswith('.pdf'))
+
 
 def extract_resume_text(dir):
-    files = os.listdir(dir)
-    pdf_files = [f for f in files if f.endswith('.pdf')]
     resume_text = []
-    for pdf_file in pdf_files:
-        reader = PdfReader(os.path.join(dir, pdf_file))
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                resume_text.append(text)
+    for pdf_file in _list_pdf_files(dir):
+        text = _extract_pdf_text(os.path.join(dir, pdf_file))
+        if text:
+            resume_text.append(text)
     return "\n".join(resume_text)
 
 
+def _load_resume_cache(cache_path):
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_resume_cache(cache_path, cache):
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+
+# Cached by path, mtime/size and content hash so unchanged PDFs are never re-parsed
+def load_resume(dir, cache_path=RESUME_CACHE_PATH):
+    cache = _load_resume_cache(cache_path)
+    updated = {}
+    texts = []
+    hashes = []
+    for pdf_file in _list_pdf_files(dir):
+        path = os.path.abspath(os.path.join(dir, pdf_file))
+        stat = os.stat(path)
+        entry = cache.get(path)
+
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            metrics.record(cache_hits=1)
+        else:
+            sha256 = _file_sha256(path)
+            if entry and entry["sha256"] == sha256:
+                entry = {**entry, "mtime": stat.st_mtime, "size": stat.st_size}
+                metrics.record(cache_hits=1)
+            else:
+                entry = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": sha256,
+                         "text": _extract_pdf_text(path)}
+
+        updated[path] = entry
+        hashes.append(entry["sha256"])
+        if entry["text"]:
+            texts.append(entry["text"])
+
+    # Other profiles' resume directories share the cache; only this directory's removed PDFs are dropped
+    directory = os.path.abspath(dir)
+    merged = {path: entry for path, entry in cache.items() if os.path.dirname(path) != directory}
+    merged.update(updated)
+    if merged != cache:
+        _save_resume_cache(cache_path, merged)
+
+    fingerprint = hashlib.sha256("\n".join(hashes).encode()).hexdigest()[:16]
+    return "\n".join(texts), fingerprint
+
+
+def load_profiles(config):
+    # Candidates to score jobs for, keyed by id; the first one is the primary profile
+    entries = config.get("profiles") or [{"id": "default"}]
+    profiles = {}
+    for entry in entries:
+        profile_id = str(entry["id"])
+        if profile_id in profiles:
+            raise ValueError(f"Duplicate profile id: {profile_id}")
+
+        resume_path = os.path.join(os.getcwd(), entry.get("resume_path", config.get("resume_path", "resumes")))
+        if not os.path.exists(resume_path):
+            print(f"Resume not found for profile '{profile_id}' at: {resume_path}")
+            return {}
+
+        resume_text, resume_fingerprint = load_resume(resume_path)
+        if not resume_text:
+            print(f"Failed to extract resume text for profile '{profile_id}'.")
+            return {}
+
+        profiles[profile_id] = {
+            "profile": entry.get("profile", config.get("profile")),
+            "resume_text": resume_text,
+            "resume_fingerprint": resume_fingerprint,
+        }
+    return profiles
+
+
 def get_config(config_path="app.yaml"):
     with open(config_path, "r") as f:
         return yaml.safe_load(f)
+
+
+def setup_logging(log_path="scraper.log"):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(log_path),
+            logging.StreamHandler()
+        ]
+    )
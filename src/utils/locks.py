@@ -0,0 +1,26 @@
+import fcntl
+import os
+from contextlib import contextmanager
+
+LOCK_DIR = "db"
+
+
+@contextmanager
+def stage_lock(*stages, lock_dir=LOCK_DIR):
+    # Yields False instead of waiting when another process is already running one of the stages
+    os.makedirs(lock_dir, exist_ok=True)
+    handles = []
+    acquired = True
+    try:
+        for stage in stages:
+            handle = open(os.path.join(lock_dir, f"{stage}.lock"), "w")
+            handles.append(handle)
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                acquired = False
+                break
+        yield acquired
+    finally:
+        for handle in handles:
+            handle.close()
@@ -0,0 +1,36 @@
+import sqlite3
+import threading
+from collections import Counter
+
+RUN_METRICS = ("jobs_processed", "llm_calls", "prompt_tokens", "tokens_saved", "cache_hits", "sheets_api_calls",
+               "errors")
+
+# Counters for the current run; stages in any thread of this process add to them
+_lock = threading.Lock()
+_counts = Counter()
+
+
+def record(**counts):
+    with _lock:
+        _counts.update(counts)
+
+
+def reset():
+    with _lock:
+        _counts.clear()
+
+
+def snapshot():
+    with _lock:
+        return {name: _counts[name] for name in RUN_METRICS}
+
+
+def save_run(command, started_at, duration, status, profile_path=None):
+    from src.db.repository import JobRepository
+
+    run_metrics = snapshot()
+    try:
+        JobRepository().insert_run(command, started_at, duration, status, run_metrics, profile_path)
+    except sqlite3.Error as e:
+        print(f"Could not record run metrics ({e}); run with --init-db to create the runs table.")
+    return run_metrics
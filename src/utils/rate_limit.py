@@ -0,0 +1,118 @@
+import multiprocessing
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+
+class RateLimitError(Exception):
+    def __init__(self, message="Rate limit exceeded", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_from_headers(headers):
+    if not headers:
+        return None
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000.0, 0.0)
+        except ValueError:
+            pass
+
+    reset = headers.get("x-ratelimit-reset") or headers.get("x-ratelimit-reset-requests")
+    if reset:
+        try:
+            value = float(reset.rstrip("s"))
+        except ValueError:
+            return None
+        if value > 1e12:  # epoch milliseconds
+            return max(value / 1000.0 - time.time(), 0.0)
+        if value > 1e9:  # epoch seconds
+            return max(value - time.time(), 0.0)
+        return max(value, 0.0)
+    return None
+
+
+class TokenBucket:
+    """Token bucket shared between processes, with AIMD adaptation to 429 responses.
+
+    The state lives in a multiprocessing array so a bucket created before a Pool
+    is forked limits the combined request rate of all workers.
+    """
+
+    _TOKENS, _LAST_REFILL, _BLOCKED_UNTIL, _RATE = range(4)
+
+    def __init__(self, requests_per_minute=None, capacity=None):
+        self.max_rate = (requests_per_minute or 0) / 60.0
+        self.min_rate = self.max_rate / 8.0
+        self.capacity = capacity or max(1.0, (requests_per_minute or 0) / 10.0)
+        self._state = multiprocessing.Array("d", [self.capacity, time.time(), 0.0, self.max_rate])
+
+    @property
+    def unlimited(self):
+        return self.max_rate <= 0
+
+    def _refill(self, now):
+        state = self._state
+        if not self.unlimited:
+            elapsed = max(now - state[self._LAST_REFILL], 0.0)
+            state[self._TOKENS] = min(self.capacity, state[self._TOKENS] + elapsed * state[self._RATE])
+        state[self._LAST_REFILL] = now
+
+    def wait_time(self):
+        with self._state.get_lock():
+            now = time.time()
+            self._refill(now)
+            blocked = max(self._state[self._BLOCKED_UNTIL] - now, 0.0)
+            if self.unlimited or self._state[self._TOKENS] >= 1:
+                return blocked
+            return max(blocked, (1 - self._state[self._TOKENS]) / self._state[self._RATE])
+
+    def acquire(self):
+        while True:
+            with self._state.get_lock():
+                now = time.time()
+                self._refill(now)
+                blocked = max(self._state[self._BLOCKED_UNTIL] - now, 0.0)
+                if not blocked and (self.unlimited or self._state[self._TOKENS] >= 1):
+                    if not self.unlimited:
+                        self._state[self._TOKENS] -= 1
+                    return
+                wait = blocked
+                if not self.unlimited and self._state[self._TOKENS] < 1:
+                    wait = max(wait, (1 - self._state[self._TOKENS]) / self._state[self._RATE])
+            time.sleep(wait + random.uniform(0, 0.1))
+
+    def record_success(self):
+        if self.unlimited:
+            return
+        with self._state.get_lock():
+            rate = self._state[self._RATE] + self.max_rate / 20.0
+            self._state[self._RATE] = min(rate, self.max_rate)
+
+    def record_rate_limited(self, retry_after=None, attempt=0):
+        with self._state.get_lock():
+            now = time.time()
+            delay = retry_after if retry_after is not None else backoff_delay(attempt + 1, base=2.0)
+            self._state[self._BLOCKED_UNTIL] = max(self._state[self._BLOCKED_UNTIL], now + delay)
+            self._state[self._TOKENS] = 0.0
+            self._state[self._LAST_REFILL] = now
+            if not self.unlimited:
+                self._state[self._RATE] = max(self._state[self._RATE] / 2.0, self.min_rate)
@@ -0,0 +1,67 @@
+import unittest
+
+from src.llm.compaction import (
+    collapse_whitespace,
+    compact_job_description,
+    estimate_tokens,
+    strip_boilerplate,
+    truncate_to_budget,
+)
+
+DESCRIPTION = """Financial Analyst
+
+We are looking for an analyst to join our finance team.
+
+Responsibilities:
+- Prepare monthly reconciliations
+- Build reports in Excel and Power BI
+
+Benefits:
+- Dental care
+- Paid time off
+
+We are an equal opportunity employer and value diversity at our company.
+We thank all applicants, however only those selected for an interview will be contacted.
+"""
+
+
+class TestCompaction(unittest.TestCase):
+    def test_strip_boilerplate_removes_sections_and_sentences(self):
+        """Test that benefits sections and EEO statements are dropped while duties are kept."""
+        result = strip_boilerplate(DESCRIPTION)
+
+        self.assertIn("Prepare monthly reconciliations", result)
+        self.assertNotIn("Dental care", result)
+        self.assertNotIn("equal opportunity", result)
+        self.assertNotIn("thank all applicants", result)
+
+    def test_strip_boilerplate_drops_repeated_blurbs(self):
+        """Test that a long paragraph repeated verbatim is kept only once."""
+        blurb = "Acme Corp is a leading provider of financial services across Canada."
+        result = strip_boilerplate(f"{blurb}\n\nDuties include reporting.\n\n{blurb}")
+
+        self.assertEqual(result.count(blurb), 1)
+
+    def test_collapse_whitespace(self):
+        """Test that runs of spaces and blank lines are collapsed."""
+        self.assertEqual(collapse_whitespace("a   b\t c\n\n\n\nd  "), "a b c\n\nd")
+
+    def test_truncate_to_budget(self):
+        """Test that text is cut to the requested token budget."""
+        text = " ".join(["word"] * 100)
+        truncated = truncate_to_budget(text, 10)
+
+        self.assertLessEqual(estimate_tokens(truncated), 11)
+        self.assertEqual(truncate_to_budget("short text", 10), "short text")
+
+    def test_compact_job_description_reports_tokens_saved(self):
+        """Test that compaction returns the estimated number of tokens removed."""
+        compacted, saved = compact_job_description(DESCRIPTION, max_tokens=1000)
+
+        self.assertGreater(saved, 0)
+        self.assertEqual(estimate_tokens(DESCRIPTION) - estimate_tokens(compacted), saved)
+        self.assertEqual(compact_job_description(None), (None, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
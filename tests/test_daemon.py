@@ -0,0 +1,90 @@
+import json
+import tempfile
+import unittest
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+from src.orchestrator import daemon as daemon_module
+from src.utils.locks import stage_lock
+
+
+class TestStageLock(unittest.TestCase):
+    def test_second_holder_is_refused(self):
+        """Test that a stage that is already locked cannot be locked again until it is released."""
+        with tempfile.TemporaryDirectory() as lock_dir:
+            with stage_lock("score", lock_dir=lock_dir) as first:
+                with stage_lock("sync", "score", lock_dir=lock_dir) as second:
+                    self.assertTrue(first)
+                    self.assertFalse(second)
+            with stage_lock("score", lock_dir=lock_dir) as again:
+                self.assertTrue(again)
+
+
+class TestDaemon(unittest.TestCase):
+    def make_daemon(self):
+        return daemon_module.Daemon({}, {"default": {"profile": "profile", "resume_text": "resume"}})
+
+    def test_failed_stage_is_counted_and_reset(self):
+        """Test that a failing stage records the failure and drops its warm client so the next run reopens it."""
+        daemon = self.make_daemon()
+        daemon.sheet = MagicMock()
+        with tempfile.TemporaryDirectory() as lock_dir, \
+                patch.object(daemon_module, "stage_lock", lambda *s: stage_lock(*s, lock_dir=lock_dir)), \
+                patch.object(daemon_module, "sync_jobs_to_sheet", side_effect=[3, None]), \
+                patch.object(daemon_module.metrics, "save_run") as save_run:
+            daemon.run_stage("sync")
+            self.assertIsNotNone(daemon.sheet)
+            daemon.run_stage("sync")
+
+        metrics = daemon.metrics["sync"]
+        self.assertEqual((metrics["runs"], metrics["failures"], metrics["items"]), (2, 1, 3))
+        self.assertEqual(metrics["last_status"], "error")
+        self.assertIsNone(daemon.sheet)
+        self.assertEqual([call[0][0] for call in save_run.call_args_list], ["daemon:sync", "daemon:sync"])
+        self.assertEqual(save_run.call_args[0][3], "error")
+
+    def test_failed_crawl_reconnects_on_next_run(self):
+        """Test that a failed crawl stops Playwright so the next crawl can start a fresh connection."""
+        daemon = self.make_daemon()
+        first, second = MagicMock(), MagicMock()
+        first_page, second_page = MagicMock(), MagicMock()
+        first_page.is_closed.return_value = False
+        second_page.is_closed.return_value = False
+        connections = [(first, None, None, first_page), (second, None, None, second_page)]
+        with tempfile.TemporaryDirectory() as lock_dir, \
+                patch.object(daemon_module, "stage_lock", lambda *s: stage_lock(*s, lock_dir=lock_dir)), \
+                patch.object(daemon_module, "connect_to_existing_browser", side_effect=connections) as connect, \
+                patch.object(daemon_module, "search_jobs", side_effect=[RuntimeError("page crashed"), None]), \
+                patch.object(daemon_module.metrics, "save_run"):
+            daemon.run_stage("crawl")
+            first.stop.assert_called_once()
+            self.assertIsNone(daemon.playwright)
+            daemon.run_stage("crawl")
+
+        self.assertEqual(connect.call_count, 2)
+        self.assertIs(daemon.playwright, second)
+        self.assertIs(daemon.page, second_page)
+        self.assertEqual(daemon.metrics["crawl"]["last_status"], "ok")
+
+    def test_health_and_metrics_endpoints(self):
+        """Test that the health endpoint serves JSON stage state and the metrics endpoint serves Prometheus text."""
+        daemon = self.make_daemon()
+        daemon.metrics["score"]["runs"] = 4
+        server = daemon_module.start_health_server(daemon, "127.0.0.1", 0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(f"{url}/health") as response:
+                health = json.load(response)
+            with urllib.request.urlopen(f"{url}/metrics") as response:
+                metrics = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(health["status"], "running")
+        self.assertEqual(health["stages"]["score"]["runs"], 4)
+        self.assertIn('job_hunter_stage_runs_total{stage="score"} 4', metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
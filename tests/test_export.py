@@ -0,0 +1,91 @@
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.db.init_db import init_db
+from src.db.repository import JobRepository
+from src.export import manager
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.temp_dir.name, "job_matches.sqlite")
+        init_db(db_path)
+        self.repo = JobRepository(db_path)
+        for i in range(5):
+            self.repo.insert_job({"job_id": f"job{i}", "title_right_pane": f"Analyst {i}",
+                                  "full_job_description_text": "Reporting", "date_updated": "2024-01-01T00:00:00"})
+        self.repo.update_job_scores("job0", 80, 60, "Good fit")
+        self.repo_patch = patch.object(manager, "repo", self.repo)
+        self.repo_patch.start()
+
+    def tearDown(self):
+        self.repo_patch.stop()
+        self.temp_dir.cleanup()
+
+    def output(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_csv_export_with_columns(self):
+        """Test that CSV export writes a header and the selected columns for every job."""
+        path = manager.export_jobs("csv", self.output("jobs.csv"), columns=["job_id", "match_score"], chunk_size=2)
+
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["job_id", "match_score"])
+        self.assertEqual(rows[1], ["job0", "80"])
+        self.assertEqual(len(rows), 6)
+
+    def test_jsonl_export_since_last_export(self):
+        """Test that incremental exports only include jobs updated after the previous export."""
+        manager.export_jobs("jsonl", self.output("all.jsonl"))
+        conn = sqlite3.connect(self.repo.db_path)
+        conn.execute("UPDATE jobs SET date_updated = '2999-01-01T00:00:00' WHERE job_id = 'job3'")
+        conn.commit()
+        conn.close()
+
+        path = manager.export_jobs("jsonl", self.output("delta.jsonl"), since_last_export=True)
+
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row["job_id"] for row in rows], ["job3"])
+
+    def test_relevance_rerank_is_exported_again(self):
+        """Test that jobs whose relevance score changed are included in the next incremental export."""
+        manager.export_jobs("jsonl", self.output("all.jsonl"))
+        self.repo.update_relevance_scores({"job1": 0.4, "job2": None})
+
+        path = manager.export_jobs("jsonl", self.output("delta.jsonl"), since_last_export=True)
+
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([(row["job_id"], row["relevance_score"]) for row in rows], [("job1", 0.4)])
+
+    def test_parquet_export_uses_declared_types(self):
+        """Test that Parquet columns follow the SQLite column types, even for all-NULL chunks."""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        path = manager.export_jobs("parquet", self.output("jobs.parquet"),
+                                   columns=["job_id", "likelihood_score", "relevance_score"], chunk_size=1)
+        table = pq.read_table(path)
+
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(str(table.schema.field("likelihood_score").type), "int64")
+        self.assertEqual(str(table.schema.field("relevance_score").type), "double")
+
+    def test_unknown_column_is_rejected(self):
+        """Test that unknown column names are rejected before any SQL is built from them."""
+        with self.assertRaises(ValueError):
+            manager.export_jobs("csv", self.output("bad.csv"), columns=["job_id; DROP TABLE jobs"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import urllib.error
+import urllib.request
+
+from benchmarks.fake_indeed_server import FakeIndeedServer, load_fixture_jobs, load_recording
+
+
+def fetch(url):
+    with urllib.request.urlopen(url) as response:
+        return response.read().decode()
+
+
+class TestFakeIndeedServer(unittest.TestCase):
+    def setUp(self):
+        self.jobs = load_fixture_jobs()
+        self.server = FakeIndeedServer(jobs=self.jobs, latency="fixed:0", layout="mixed", page_size=5).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_results_are_paginated(self):
+        """Test that each results page holds page_size cards and links to the next page."""
+        first = fetch(f"{self.server.url}/jobs?q=Analyst&l=Ontario")
+        last = fetch(f"{self.server.url}/jobs?q=Analyst&l=Ontario&start=10")
+
+        self.assertIn(f'data-jk="{self.jobs[0]["job_id"]}"', first)
+        self.assertIn(f'job_{self.jobs[1]["job_id"]}', first)
+        self.assertNotIn(self.jobs[5]["job_id"], first)
+        self.assertIn("start=5", first)
+        self.assertNotIn("pagination-page-next", last)
+
+    def test_panes_alternate_layouts(self):
+        """Test that the mixed layout serves primary and fallback panes and 404s unknown jobs."""
+        primary = fetch(f"{self.server.url}/pane?jk={self.jobs[0]['job_id']}")
+        fallback = fetch(f"{self.server.url}/pane?jk={self.jobs[1]['job_id']}")
+
+        self.assertIn('id="salaryInfoAndJobType"', primary)
+        self.assertIn('aria-label="Pay"', fallback)
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            fetch(f"{self.server.url}/pane?jk=0000000000000000")
+        self.assertEqual(context.exception.code, 404)
+        self.assertEqual(self.server.counts["/pane"], 3)
+
+
+class TestRecordedPages(unittest.TestCase):
+    def setUp(self):
+        self.recording = load_recording("sample_recording")
+        self.server = FakeIndeedServer(latency="fixed:0", recording=self.recording).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_recording_has_a_pane_per_golden_job(self):
+        """Test that every job in the golden file has a saved right pane."""
+        self.assertEqual(sorted(self.recording["panes"]), sorted(self.recording["golden"]))
+
+    def test_saved_results_page_stays_local(self):
+        """Test that the saved page is served without its own scripts or its link to the live next page."""
+        page = fetch(f"{self.server.url}/jobs?q=Data+Analyst&l=Ontario")
+
+        self.assertIn('data-jk="5a3e000000000001"', page)
+        self.assertNotIn("bundle.js", page)
+        self.assertNotIn("pagination-page-next", page)
+        self.assertIn('fetch("/pane?jk="', page)
+
+    def test_saved_panes_are_served(self):
+        """Test that /pane serves the saved pane of a job."""
+        pane = fetch(f"{self.server.url}/pane?jk=5a3e000000000002")
+
+        self.assertEqual(pane, self.recording["panes"]["5a3e000000000002"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import unittest
+
+from ollama import Client
+from openai import OpenAI, RateLimitError
+
+from benchmarks.fake_llm_server import FakeLLMServer
+
+
+class TestFakeLLMServer(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeLLMServer(latency="fixed:0", chunk_delay=0).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_ollama_chat_stream(self):
+        """Test that the Ollama client can stream a rating from the fake server."""
+        client = Client(host=self.server.url)
+        chunks = client.chat(model="fake", messages=[{"role": "user", "content": "hi"}], stream=True)
+        content = "".join(chunk["message"]["content"] for chunk in chunks)
+
+        self.assertIn("match_score", json.loads(content))
+
+    def test_openai_chat_completion(self):
+        """Test that the OpenAI client gets a rating from the fake server."""
+        client = OpenAI(base_url=f"{self.server.url}/v1", api_key="test", max_retries=0)
+        response = client.chat.completions.create(model="fake", messages=[{"role": "user", "content": "hi"}])
+
+        self.assertIn("likelihood_score", json.loads(response.choices[0].message.content))
+
+    def test_rate_limit_injection(self):
+        """Test that injected 429s carry a Retry-After header."""
+        self.server.rate_limit_rate = 1.0
+        client = OpenAI(base_url=f"{self.server.url}/v1", api_key="test", max_retries=0)
+        with self.assertRaises(RateLimitError) as context:
+            client.chat.completions.create(model="fake", messages=[{"role": "user", "content": "hi"}])
+
+        self.assertEqual(context.exception.response.headers["retry-after"], "1.0")
+        self.assertEqual(self.server.counts["openai:429"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
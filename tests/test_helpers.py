@@ -1,9 +1,10 @@
+import json
 import os
 import tempfile
 import unittest
 from unittest.mock import patch, mock_open
 
-from src.utils.helpers import get_config, extract_resume_text
+from src.utils.helpers import get_config, extract_resume_text, load_profiles, load_resume
 
 
 class TestHelpers(unittest.TestCase):
@@ -50,6 +51,68 @@ class TestHelpers(unittest.TestCase):
                 # Verify the result
                 self.assertEqual(result, 'Test resume text page 1\nTest resume text page 2')
 
+    def test_load_resume_uses_cache(self):
+        """Test that load_resume only re-parses PDFs whose content changed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, 'cache', 'resume_cache.json')
+            pdf_path = os.path.join(temp_dir, 'resume.pdf')
+            with open(pdf_path, 'w') as f:
+                f.write('dummy pdf content')
+
+            with patch('src.utils.helpers.PdfReader') as mock_pdf_reader:
+                mock_page = type('Page', (), {'extract_text': lambda: 'Cached resume text'})
+                mock_pdf_reader.return_value.pages = [mock_page]
+
+                text, fingerprint = load_resume(temp_dir, cache_path=cache_path)
+                self.assertEqual(text, 'Cached resume text')
+                self.assertEqual(mock_pdf_reader.call_count, 1)
+
+                # Unchanged file: served from the cache with the same fingerprint
+                cached_text, cached_fingerprint = load_resume(temp_dir, cache_path=cache_path)
+                self.assertEqual(cached_text, text)
+                self.assertEqual(cached_fingerprint, fingerprint)
+                self.assertEqual(mock_pdf_reader.call_count, 1)
+
+                # Changed content: re-parsed and fingerprinted again
+                with open(pdf_path, 'w') as f:
+                    f.write('updated pdf content, different size')
+                _, new_fingerprint = load_resume(temp_dir, cache_path=cache_path)
+                self.assertEqual(mock_pdf_reader.call_count, 2)
+                self.assertNotEqual(new_fingerprint, fingerprint)
+
+    def test_profiles_share_the_resume_cache(self):
+        """Test that profiles with different resume directories do not evict each other's cache entries."""
+        config = {"profiles": [{"id": "alice", "resume_path": "alice"}, {"id": "bob", "resume_path": "bob"}]}
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            try:
+                for profile_id in ("alice", "bob"):
+                    os.makedirs(profile_id)
+                    with open(os.path.join(profile_id, 'resume.pdf'), 'w') as f:
+                        f.write(f'{profile_id} pdf content')
+
+                with patch('src.utils.helpers.PdfReader') as mock_pdf_reader:
+                    mock_page = type('Page', (), {'extract_text': lambda: 'Resume text'})
+                    mock_pdf_reader.return_value.pages = [mock_page]
+
+                    self.assertEqual(list(load_profiles(config)), ["alice", "bob"])
+                    self.assertEqual(mock_pdf_reader.call_count, 2)
+                    load_profiles(config)
+                    self.assertEqual(mock_pdf_reader.call_count, 2)
+
+                    # A PDF removed from one directory is dropped without touching the other
+                    os.remove(os.path.join("bob", "resume.pdf"))
+                    with open(os.path.join("bob", "new.pdf"), 'w') as f:
+                        f.write('new pdf content')
+                    load_profiles(config)
+                    self.assertEqual(mock_pdf_reader.call_count, 3)
+                    with open(os.path.join("db", "resume_cache.json")) as f:
+                        cached = sorted(os.path.relpath(path) for path in json.load(f))
+                self.assertEqual(cached, [os.path.join("alice", "resume.pdf"), os.path.join("bob", "new.pdf")])
+            finally:
+                os.chdir(cwd)
+
 
 if __name__ == '__main__':
     unittest.main()
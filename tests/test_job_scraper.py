@@ -0,0 +1,64 @@
+import unittest
+
+from src.orchestrator.job_scraper import extract_job_details_from_right_pane
+
+
+class FakeElement:
+    def __init__(self, text="", children=()):
+        self.text = text
+        self.children = list(children)
+
+    def inner_text(self):
+        return self.text
+
+    def inner_html(self):
+        return self.text
+
+    def query_selector(self, selector):
+        return None
+
+    def query_selector_all(self, selector):
+        return self.children
+
+
+class FakePage:
+    # Answers a selector with the element registered under any part of it
+    def __init__(self, elements):
+        self.elements = elements
+
+    def query_selector(self, selector):
+        for part, element in self.elements.items():
+            if part in selector:
+                return element
+        return None
+
+
+def header(title, combo):
+    return FakePage({
+        'h2[data-testid="jobsearch-JobInfoHeader-title"] span': FakeElement(title),
+        "div#salaryInfoAndJobType": FakeElement(children=[FakeElement(text) for text in combo]),
+    })
+
+
+class TestRightPane(unittest.TestCase):
+    def test_job_post_suffix_is_removed_from_title(self):
+        """Test that the "- job post" label is stripped from the right pane title."""
+        for title in ("Data Analyst - job post", "Data Analyst\n- job post", "Data Analyst"):
+            details = extract_job_details_from_right_pane(header(title, []), "abc", "Card title")
+            self.assertEqual(details["title_right_pane"], "Data Analyst")
+
+    def test_pay_and_job_type_combo(self):
+        """Test that the header line is split into pay and job type when either part is missing."""
+        cases = [
+            (["$60,000–$70,000 a year", "-\u00a0Full-time"], ("$60,000–$70,000 a year", "Full-time")),
+            (["$25 an hour"], ("$25 an hour", None)),
+            (["Part-time"], (None, "Part-time")),
+            (["", "- Contract"], (None, "Contract")),
+        ]
+        for combo, expected in cases:
+            details = extract_job_details_from_right_pane(header("Data Analyst", combo), "abc", "Data Analyst")
+            self.assertEqual((details["pay"], details["job_type"]), expected, combo)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from src.db.init_db import init_db
+from src.db.normalize import filter_reason, load_filter_rules, normalize_job, normalize_job_types, \
+    normalize_location, normalize_pay
+from src.db.repository import JobRepository
+
+CONFIG = {
+    "search_criteria": {"salary_min": "60000"},
+    "filters": {"enabled": True, "exclude_job_types": ["internship"], "allowed_work_modes": ["remote", "hybrid"],
+                "allowed_regions": ["on"], "exclude_title_keywords": ["senior"]},
+}
+
+
+class TestNormalize(unittest.TestCase):
+    def test_pay_is_annualized(self):
+        """Test that pay ranges, open ends and periods become annual min/max figures."""
+        self.assertEqual(normalize_pay("$60,000–$75,000 a year"), (60000, 75000, "year"))
+        self.assertEqual(normalize_pay("$25 - $30 an hour"), (52000, 62400, "hour"))
+        self.assertEqual(normalize_pay("From $5,000 a month"), (60000, None, "month"))
+        self.assertEqual(normalize_pay("Up to $90K per year"), (None, 90000, "year"))
+        self.assertEqual(normalize_pay("$1,200 weekly"), (62400, 62400, "week"))
+        self.assertEqual(normalize_pay("Competitive salary"), (None, None, None))
+        self.assertEqual(normalize_pay(None), (None, None, None))
+
+    def test_job_types_and_location(self):
+        """Test that job types and locations map onto their enums."""
+        self.assertEqual(normalize_job_types("Full-time, Permanent"), "full_time,permanent")
+        self.assertEqual(normalize_job_types("Fixed term contract\nPart time"), "part_time,contract")
+        self.assertIsNone(normalize_job_types("Other"))
+        self.assertIsNone(normalize_job_types("Cooperative"))
+        self.assertEqual(normalize_job_types("Co-op"), "internship")
+        self.assertEqual(normalize_location("Remote in Toronto, ON"), ("remote", "ON"))
+        self.assertEqual(normalize_location("Hybrid work in Vancouver, BC V6B 1A1"), ("hybrid", "BC"))
+        self.assertEqual(normalize_location("Ontario"), ("on_site", "ON"))
+        self.assertEqual(normalize_location("Unknown"), (None, None))
+
+    def test_filter_rules(self):
+        """Test that each hard filter rejects a job while missing values pass."""
+        rules = load_filter_rules(CONFIG)
+
+        def reason(title="Analyst", **job):
+            return filter_reason(title, normalize_job({"location": "Remote", **job}), rules)
+
+        self.assertEqual(rules["min_annual_pay"], 60000)
+        self.assertIsNone(reason(pay="$30 an hour", job_type="Full-time"))
+        self.assertIsNone(reason())
+        self.assertIn("below the minimum", reason(pay="$20 an hour"))
+        self.assertIn("internship", reason(job_type="Internship"))
+        self.assertIn("on_site", reason(location="Ottawa, ON"))
+        self.assertIn("Region BC", reason(location="Hybrid in Vancouver, BC"))
+        self.assertIn("senior", reason(title="Senior Financial Analyst"))
+        self.assertIsNone(load_filter_rules({"filters": {"enabled": False}}))
+
+
+class TestFilteredJobs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.temp_dir.name, "job_matches.sqlite")
+        init_db(db_path)
+        self.repo = JobRepository(db_path)
+        rules = load_filter_rules(CONFIG)
+        self.repo.insert_job({"job_id": "low", "title_right_pane": "Analyst", "pay": "$18 an hour",
+                              "location": "Remote"}, filter_rules=rules)
+        self.repo.insert_job({"job_id": "good", "title_right_pane": "Analyst", "pay": "$80,000 a year",
+                              "location": "Hybrid in Toronto, ON"}, filter_rules=rules)
+        self.repo.insert_job({"job_id": "unknown", "title_right_pane": "Analyst"}, filter_rules=rules)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_filtered_jobs_are_not_scored(self):
+        """Test that jobs rejected at insert time never reach the scoring queue."""
+        jobs = self.repo.get_pending_scores(["default"], "default")
+        self.assertEqual([job["job_id"] for job in jobs], ["good", "unknown"])
+
+    def test_export_filters(self):
+        """Test that exports can filter on the normalized pay and work mode columns."""
+        def exported(**filters):
+            return [row[0] for rows in self.repo.iter_jobs_for_export(["job_id"], **filters) for row in rows]
+
+        self.assertEqual(exported(min_annual_pay=70000), ["good"])
+        self.assertEqual(exported(work_modes=["remote"]), ["low"])
+        self.assertEqual(exported(skip_filtered=True), ["good", "unknown"])
+
+    def test_normalize_jobs_reapplies_rules(self):
+        """Test that the backfill recomputes the normalized columns and filters with new rules."""
+        self.assertEqual(self.repo.normalize_jobs(None), (3, 0))
+        self.assertEqual(len(self.repo.get_pending_scores(["default"], "default")), 3)
+
+        rules = load_filter_rules({**CONFIG, "filters": {"enabled": True, "min_annual_pay": 90000}})
+        self.assertEqual(self.repo.normalize_jobs(rules), (3, 2))
+        self.assertEqual([job["job_id"] for job in self.repo.get_pending_scores(["default"], "default")],
+                         ["unknown"])
+
+    def test_changed_rows_are_exported_again(self):
+        """Test that the backfill bumps date_updated only on the rows whose normalized columns changed."""
+        conn = sqlite3.connect(self.repo.db_path)
+        conn.execute("UPDATE jobs SET date_updated = '2025-01-01T00:00:00'")
+        conn.commit()
+        conn.close()
+
+        def exported_since():
+            return [row[0] for rows in self.repo.iter_jobs_for_export(["job_id"], since="2025-01-02T00:00:00")
+                    for row in rows]
+
+        self.repo.normalize_jobs(load_filter_rules(CONFIG))
+        self.assertEqual(exported_since(), [])
+
+        # "low" stays filtered but its reason now names the new minimum; "unknown" has no pay and is unchanged
+        self.repo.normalize_jobs(load_filter_rules({**CONFIG, "filters": {"enabled": True, "min_annual_pay": 90000}}))
+        self.assertEqual(exported_since(), ["low", "good"])
+
+
+if __name__ == '__main__':
+    unittest.main()
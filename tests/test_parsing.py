@@ -0,0 +1,59 @@
+import unittest
+
+from src.llm.model import rater_response_format
+from src.llm.parsing import extract_json_object, parse_rater_response, repair_json, strip_thinking
+
+VALID = '{"match_score": 85, "likelihood_score": 70, "match_reason": "Good fit", "likelihood_reason": "Some gaps"}'
+
+
+class TestParsing(unittest.TestCase):
+    def test_parse_valid_json(self):
+        """Test that well-formed JSON is parsed into a RaterResponse."""
+        parsed = parse_rater_response(VALID)
+
+        self.assertEqual(parsed.match_score, 85)
+        self.assertEqual(parsed.likelihood_reason, "Some gaps")
+
+    def test_parse_fenced_json_after_thinking(self):
+        """Test that reasoning blocks and markdown code fences are removed."""
+        text = f"<think>Let me weigh this {{carefully}}.</think>\nHere you go:\n```json\n{VALID}\n```"
+
+        self.assertEqual(parse_rater_response(text).likelihood_score, 70)
+
+    def test_repair_near_valid_json(self):
+        """Test that trailing commas, unquoted keys and string numbers are recovered."""
+        text = '{match_score: "85", "likelihood_score": 70, "match_reason": "Fit, overall: good", ' \
+               '"likelihood_reason": "Gaps",}'
+        parsed = parse_rater_response(text)
+
+        self.assertEqual(parsed.match_score, 85)
+        self.assertEqual(parsed.match_reason, "Fit, overall: good")
+
+    def test_repair_truncated_json(self):
+        """Test that a response cut off mid-string is closed and parsed."""
+        text = '{"match_score": 60, "likelihood_score": 40, "match_reason": "ok", "likelihood_reason": "cut off'
+
+        self.assertEqual(parse_rater_response(text).likelihood_reason, "cut off")
+
+    def test_unrecoverable_responses(self):
+        """Test that text without a usable object returns None."""
+        self.assertIsNone(parse_rater_response(None))
+        self.assertIsNone(parse_rater_response("I cannot rate this job."))
+        self.assertIsNone(parse_rater_response('{"match_score": 85}'))
+
+    def test_helpers(self):
+        """Test the individual extraction and repair steps."""
+        self.assertEqual(strip_thinking("<think>unfinished"), "")
+        self.assertEqual(extract_json_object('prefix {"a": "}"} suffix'), '{"a": "}"}')
+        self.assertEqual(repair_json("{'a': True,}"), '{"a": true}')
+
+    def test_response_format_is_strict(self):
+        """Test that the OpenAI response format forbids extra keys and requires every field."""
+        schema = rater_response_format()["json_schema"]["schema"]
+
+        self.assertFalse(schema["additionalProperties"])
+        self.assertEqual(set(schema["required"]), set(schema["properties"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import queue
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.orchestrator import pipeline
+
+
+def filled_queue(*items):
+    source = queue.Queue()
+    for item in items:
+        source.put(item)
+    return source
+
+
+class TestNextBatch(unittest.TestCase):
+    def test_stops_at_max_items(self):
+        """Test that a batch holds at most max_items and leaves the rest queued."""
+        source = filled_queue("a", "b", "c")
+        self.assertEqual(pipeline._next_batch(source, 2, 1), (["a", "b"], False))
+        self.assertEqual(source.qsize(), 1)
+
+    def test_returns_partial_batch_after_max_wait(self):
+        """Test that a partial batch is returned once max_wait passes without more items."""
+        source = filled_queue("a")
+        self.assertEqual(pipeline._next_batch(source, 5, 0.05), (["a"], False))
+
+    def test_done_sentinel_ends_batch(self):
+        """Test that the done sentinel ends the batch and reports that the stage is finished."""
+        source = filled_queue("a", pipeline._DONE, "b")
+        self.assertEqual(pipeline._next_batch(source, 5, 1), (["a"], True))
+        self.assertEqual(pipeline._next_batch(filled_queue(pipeline._DONE), 5, 1), ([], True))
+
+
+class TestRunPipeline(unittest.TestCase):
+    def run_pipeline(self, sync, relevance=None, prefilter=None, open_sheet=None, fit_idf=None):
+        def fake_search(config, on_job_inserted):
+            for job_id in ["j1", "j2", "j3"]:
+                on_job_inserted(job_id)
+
+        def fake_score(pool, jobs, stats, profiles):
+            stats["scored"] += len(jobs)
+            return set()
+
+        config = {"pipeline": {"score_max_wait": 0.05, "sync_interval": 0.05},
+                  "relevance": relevance or {"enabled": False}}
+        repo = MagicMock()
+        repo.get_pending_scores.side_effect = lambda profile_ids, primary, limit, job_ids: [
+            {"job_id": job_id, "profile_ids": profile_ids} for job_id in job_ids]
+        with patch.object(pipeline, "search_jobs", fake_search), \
+                patch.object(pipeline, "repo", repo), \
+                patch.object(pipeline, "sync_jobs_to_sheet", sync), \
+                patch.object(pipeline, "open_sheet", open_sheet or MagicMock()), \
+                patch.object(pipeline.rater, "open_scoring_pool", MagicMock()), \
+                patch.object(pipeline.rater, "score_batch", fake_score), \
+                patch.object(pipeline.rater, "prefilter_jobs", prefilter or MagicMock()), \
+                patch.object(pipeline.rater, "fit_relevance_idf", fit_idf or MagicMock()):
+            return pipeline.run_pipeline(config, {"default": {"profile": "profile", "resume_text": "resume"}})
+
+    def test_jobs_flow_from_crawl_to_sync(self):
+        """Test that jobs inserted by the crawler are scored and synced in batches through one sheet."""
+        synced = []
+
+        def sync(config, job_ids, sheet):
+            synced.extend(job_ids)
+            return len(job_ids)
+
+        open_sheet = MagicMock()
+        stats = self.run_pipeline(sync, open_sheet=open_sheet)
+
+        self.assertEqual(stats["scored"], 3)
+        self.assertEqual(stats["synced"], 3)
+        self.assertEqual(sorted(synced), ["j1", "j2", "j3"])
+        open_sheet.assert_called_once()
+
+    def test_failed_sync_is_not_counted(self):
+        """Test that batches whose sync failed are reported as failures rather than synced rows."""
+        stats = self.run_pipeline(MagicMock(return_value=None))
+
+        self.assertEqual(stats["synced"], 0)
+        self.assertGreaterEqual(stats["sync_failures"], 1)
+
+    def test_prefilter_ranks_only_the_batch(self):
+        """Test that the relevance prefilter ranks each scoring batch against term weights fitted once."""
+        prefilter = MagicMock()
+        fit_idf = MagicMock(return_value="idf")
+        self.run_pipeline(MagicMock(return_value=0), relevance={"enabled": True}, prefilter=prefilter,
+                          fit_idf=fit_idf)
+
+        ranked = [job_id for call in prefilter.call_args_list for job_id in call.kwargs["job_ids"]]
+        self.assertEqual(sorted(ranked), ["j1", "j2", "j3"])
+        fit_idf.assert_called_once()
+        self.assertEqual({call.kwargs["idf"] for call in prefilter.call_args_list}, {"idf"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import pstats
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from src.db.init_db import init_db
+from src.utils import metrics
+from src.utils.profiling import profile_stage
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestProfileStage(unittest.TestCase):
+    def test_sampling_profile_writes_folded_stacks(self):
+        """Test that the sampling profiler writes folded stacks rooted at the thread name."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            with profile_stage("score-jobs", "sample", output_dir=output_dir) as path:
+                busy_wait(0.2)
+
+            with open(path) as f:
+                lines = f.read().splitlines()
+
+        self.assertTrue(path.endswith(".folded"))
+        busy_lines = [line for line in lines if "busy_wait (test_profiling.py" in line]
+        self.assertTrue(busy_lines)
+        stack, count = busy_lines[0].rsplit(" ", 1)
+        self.assertTrue(stack.startswith("MainThread;"))
+        self.assertGreater(int(count), 0)
+
+    def test_cprofile_writes_pstats(self):
+        """Test that cprofile mode writes a stats file that pstats can load."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            with profile_stage("sync-sheet", "cprofile", output_dir=output_dir) as path:
+                busy_wait(0.01)
+
+            stats = pstats.Stats(path)
+        self.assertTrue(any(func[2] == "busy_wait" for func in stats.stats))
+
+    def test_no_mode_does_nothing(self):
+        """Test that profiling is skipped when no mode is given."""
+        with profile_stage("init-db", None) as path:
+            pass
+        self.assertIsNone(path)
+
+
+class TestRunMetrics(unittest.TestCase):
+    def test_save_run_records_counters(self):
+        """Test that a run and its counters are stored in the runs table."""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            try:
+                os.makedirs("db")
+                init_db()
+                metrics.reset()
+                metrics.record(jobs_processed=3, llm_calls=4, prompt_tokens=900)
+                metrics.record(llm_calls=1, errors=1)
+                metrics.save_run("score-jobs", "2025-01-01T00:00:00", 1.5, "ok", "profiles/x.folded")
+
+                conn = sqlite3.connect("db/job_matches.sqlite")
+                row = conn.execute("SELECT command, duration, status, jobs_processed, llm_calls, prompt_tokens, "
+                                   "cache_hits, errors, profile_path FROM runs").fetchone()
+                conn.close()
+            finally:
+                os.chdir(cwd)
+                metrics.reset()
+
+        self.assertEqual(row, ("score-jobs", 1.5, "ok", 3, 5, 900, 0, 1, "profiles/x.folded"))
+
+
+if __name__ == "__main__":
+    unittest.main()
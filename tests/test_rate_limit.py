@@ -0,0 +1,49 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from src.utils.rate_limit import TokenBucket, backoff_delay, retry_after_from_headers
+
+
+class TestRateLimit(unittest.TestCase):
+    def test_backoff_delay_is_capped(self):
+        """Test that jittered backoff never exceeds the exponential bound or the cap."""
+        for attempt in range(10):
+            delay = backoff_delay(attempt, base=1.0, cap=30.0)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(30.0, 2 ** attempt))
+
+    def test_retry_after_from_headers(self):
+        """Test parsing of Retry-After and rate limit reset headers."""
+        self.assertEqual(retry_after_from_headers({"retry-after": "12"}), 12.0)
+        self.assertEqual(retry_after_from_headers({"retry-after-ms": "1500"}), 1.5)
+        reset_ms = str(int((time.time() + 10) * 1000))
+        self.assertAlmostEqual(retry_after_from_headers({"x-ratelimit-reset": reset_ms}), 10, delta=1)
+        self.assertIsNone(retry_after_from_headers({}))
+
+    def test_bucket_paces_requests(self):
+        """Test that an empty bucket reports the time until the next token."""
+        bucket = TokenBucket(requests_per_minute=60, capacity=1)
+        bucket.acquire()
+
+        self.assertGreater(bucket.wait_time(), 0.5)
+
+    def test_rate_limited_bucket_blocks_and_slows_down(self):
+        """Test that a 429 blocks the bucket for retry_after and halves its rate."""
+        bucket = TokenBucket(requests_per_minute=120)
+        bucket.record_rate_limited(retry_after=5)
+
+        self.assertAlmostEqual(bucket.wait_time(), 5, delta=0.5)
+        self.assertAlmostEqual(bucket._state[TokenBucket._RATE], 1.0)
+
+    def test_unlimited_bucket_never_waits(self):
+        """Test that a bucket without a configured limit does not sleep."""
+        bucket = TokenBucket()
+        with patch("src.utils.rate_limit.time.sleep") as mock_sleep:
+            for _ in range(100):
+                bucket.acquire()
+            mock_sleep.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from src.llm.relevance import fit_idf, relevance_scores, tfidf_matrix, tokenize
+
+
+class TestRelevance(unittest.TestCase):
+    def test_tokenize_drops_stopwords(self):
+        """Test that tokenize lowercases text and removes stopwords."""
+        self.assertEqual(tokenize("The Data Analyst and SQL"), ["data", "analyst", "sql"])
+
+    def test_tfidf_rows_are_normalized(self):
+        """Test that non-empty TF-IDF rows have unit length."""
+        matrix = tfidf_matrix(["financial analyst reporting", "retail cashier", ""])
+        norms = matrix.multiply(matrix).sum(axis=1)
+
+        self.assertAlmostEqual(float(norms[0, 0]), 1.0)
+        self.assertAlmostEqual(float(norms[1, 0]), 1.0)
+        self.assertEqual(float(norms[2, 0]), 0.0)
+
+    def test_relevant_jobs_rank_higher(self):
+        """Test that a matching job scores above an unrelated one."""
+        query = "Data Analyst. SQL, Python, Excel and Power BI reporting for finance teams."
+        scores = relevance_scores(query, [
+            "Retail sales associate to stock shelves and serve customers at the register.",
+            "Data Analyst building SQL models and Power BI dashboards for finance.",
+        ])
+
+        self.assertGreater(scores[1], scores[0])
+        self.assertEqual(len(relevance_scores(query, [])), 0)
+
+    def test_fitted_idf_does_not_depend_on_the_batch(self):
+        """Test that a job scores the same in any batch once the term weights are fitted over the backlog."""
+        query = "Data Analyst. SQL and Power BI reporting."
+        backlog = [
+            "Data Analyst building SQL models and Power BI dashboards.",
+            "Data entry clerk for a retail warehouse.",
+            "SQL developer maintaining reporting databases.",
+            "Line cook for a busy downtown restaurant.",
+        ]
+        idf = fit_idf(backlog)
+
+        alone = relevance_scores(query, backlog[:1], idf)
+        together = relevance_scores(query, backlog[:3], idf)
+        self.assertAlmostEqual(float(alone[0]), float(together[0]))
+        self.assertNotAlmostEqual(float(relevance_scores(query, backlog[:1])[0]),
+                                  float(relevance_scores(query, backlog[:3])[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
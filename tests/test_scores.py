@@ -0,0 +1,199 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.db.init_db import init_db
+from src.db.repository import JobRepository
+from src.llm import rater
+
+
+class ScoresTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.temp_dir.name, "job_matches.sqlite")
+        init_db(db_path)
+        self.repo = JobRepository(db_path)
+        for i in range(3):
+            self.repo.insert_job({"job_id": f"job{i}", "title_right_pane": f"Analyst {i}",
+                                  "full_job_description_text": "Reporting"})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestPendingScores(ScoresTestCase):
+    def test_jobs_fan_out_to_profiles_without_scores(self):
+        """Test that each job lists only the profiles that have no score for it yet."""
+        self.repo.insert_scores([("job0", "alice", "ollama/qwen3:8b", 70, 60, "Fit", 0, "p1", "a1", "r1")])
+        # Scores on the jobs table count for the primary profile only
+        self.repo.update_job_scores("job1", 80, 60, "Good fit")
+
+        jobs = self.repo.get_pending_scores(["alice", "bob"], "alice")
+
+        self.assertEqual([(job["job_id"], job["profile_ids"]) for job in jobs],
+                         [("job0", ["bob"]), ("job1", ["bob"]), ("job2", ["alice", "bob"])])
+
+    def test_limit_counts_jobs_not_pairs(self):
+        """Test that the limit caps the number of jobs while keeping all of each job's profiles."""
+        jobs = self.repo.get_pending_scores(["alice", "bob"], "alice", limit=2)
+        self.assertEqual([(job["job_id"], job["profile_ids"]) for job in jobs],
+                         [("job0", ["alice", "bob"]), ("job1", ["alice", "bob"])])
+
+    def test_limit_applies_to_jobs_with_pending_profiles(self):
+        """Test that fully scored jobs do not use up the limit and jobs keep relevance order."""
+        self.repo.update_relevance_scores({"job0": 0.9, "job1": 0.1, "job2": 0.5})
+        self.repo.insert_scores([("job0", profile_id, "ollama/qwen3:8b", 70, 60, "Fit", 0, "p1", "a1", "r1")
+                                 for profile_id in ("alice", "bob")])
+
+        jobs = self.repo.get_pending_scores(["alice", "bob"], "alice", limit=1)
+
+        self.assertEqual([(job["job_id"], job["profile_ids"]) for job in jobs], [("job2", ["alice", "bob"])])
+
+    def test_excluded_pairs_are_skipped(self):
+        """Test that profiles that already failed for a job are not returned again in the same run."""
+        jobs = self.repo.get_pending_scores(["alice", "bob"], "alice", limit=2,
+                                            exclude={("job0", "alice"), ("job1", "alice"), ("job1", "bob")})
+        self.assertEqual([(job["job_id"], job["profile_ids"]) for job in jobs],
+                         [("job0", ["bob"]), ("job2", ["alice", "bob"])])
+
+    def test_many_excluded_pairs(self):
+        """Test that more failed pairs than SQLite can bind as parameters are still excluded."""
+        conn = sqlite3.connect(self.repo.db_path)
+        max_variables = conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+        conn.close()
+        exclude = {(f"gone{i}", "alice") for i in range(max_variables // 2 + 1)} | {("job0", "alice")}
+        jobs = self.repo.get_pending_scores(["alice"], "alice", limit=1, exclude=exclude)
+        self.assertEqual([job["job_id"] for job in jobs], ["job1"])
+
+    def test_job_ids_filter(self):
+        """Test that pending scores can be limited to specific jobs."""
+        jobs = self.repo.get_pending_scores(["alice"], "alice", limit=None, job_ids=["job2"])
+        self.assertEqual([job["job_id"] for job in jobs], ["job2"])
+
+
+class TestScorePendingJobs(ScoresTestCase):
+    def test_failed_pairs_are_tried_once_per_run(self):
+        """Test that a run stops after every pair has failed once instead of refetching the failures."""
+        batches = []
+
+        def failing_batch(pool, jobs, stats, profiles):
+            batches.append([(job["job_id"], job["profile_ids"]) for job in jobs])
+            return [(job["job_id"], profile_id) for job in jobs for profile_id in job["profile_ids"]]
+
+        profiles = {"alice": {}, "bob": {}}
+        with patch.object(rater, "repo", self.repo), patch.object(rater, "score_batch", failing_batch):
+            rater.score_pending_jobs({}, None, profiles, 2, rater.new_stats())
+
+        self.assertEqual(batches, [[("job0", ["alice", "bob"]), ("job1", ["alice", "bob"])],
+                                   [("job2", ["alice", "bob"])]])
+
+
+class TestPrefilter(ScoresTestCase):
+    PROFILES = {profile_id: {"profile": "Analyst", "resume_text": "SQL",
+                             "fingerprints": {"prompt": "p1", "profile": f"{profile_id}-p", "resume": f"{profile_id}-r"}}
+                for profile_id in ("alice", "bob")}
+
+    def test_only_pending_pairs_are_auto_scored(self):
+        """Test that the prefilter covers a new profile's backlog and leaves existing scores alone."""
+        self.repo.insert_scores([("job0", "alice", "ollama/qwen3:8b", 70, 60, "Fit", 0, "p1", "alice-p", "alice-r")])
+        config = {"relevance": {"enabled": True, "action": "auto_score", "threshold": 0.05, "low_score": 0}}
+        with patch.object(rater, "repo", self.repo), \
+                patch.object(rater, "relevance_scores", lambda query, documents, idf: [0.0] * len(documents)):
+            rater.prefilter_jobs(config, self.PROFILES)
+
+        conn = sqlite3.connect(self.repo.db_path)
+        scores = conn.execute("SELECT job_id, profile_id, model FROM scores ORDER BY job_id, profile_id").fetchall()
+        job_scores = conn.execute("SELECT job_id, match_score FROM jobs ORDER BY job_id").fetchall()
+        conn.close()
+        self.assertEqual(scores, [("job0", "alice", "ollama/qwen3:8b"), ("job0", "bob", "relevance-prefilter"),
+                                  ("job1", "alice", "relevance-prefilter"), ("job1", "bob", "relevance-prefilter"),
+                                  ("job2", "alice", "relevance-prefilter"), ("job2", "bob", "relevance-prefilter")])
+        self.assertEqual(job_scores, [("job0", None), ("job1", 0), ("job2", 0)])
+        self.assertEqual(self.repo.get_pending_scores(["alice", "bob"], "alice"), [])
+
+    def test_stale_prefilter_scores_are_ranked_again(self):
+        """Test that prefilter scores for an old profile are replaced with ones for the current profile."""
+        self.repo.insert_scores([(f"job{i}", "alice", "relevance-prefilter", 0, 0, "Prefilter", 0, None, "old-p",
+                                  "alice-r") for i in range(3)])
+        profiles = {"alice": self.PROFILES["alice"]}
+        config = {"backend": "ollama", "ollama": {"model": "qwen3:8b"},
+                  "relevance": {"enabled": True, "action": "auto_score", "threshold": 0.05, "low_score": 0}}
+        with patch.object(rater, "repo", self.repo), \
+                patch.object(rater, "relevance_scores", lambda query, documents, idf: [0.0, 0.0, 0.9]):
+            self.assertEqual(len(self.repo.get_stale_scores({"alice": profiles["alice"]["fingerprints"]},
+                                                            ["ollama/qwen3:8b"])), 3)
+            rater.prefilter_jobs(config, profiles, stale=True)
+
+        stale = self.repo.get_stale_scores({"alice": profiles["alice"]["fingerprints"]}, ["ollama/qwen3:8b"])
+        self.assertEqual(len(stale), 1)
+
+
+class TestStaleScores(ScoresTestCase):
+    FINGERPRINTS = {"alice": {"prompt": "p1", "profile": "a1", "resume": "r1"},
+                    "bob": {"prompt": "p1", "profile": "b1", "resume": "r2"}}
+
+    def setUp(self):
+        super().setUp()
+        conn = sqlite3.connect(self.repo.db_path)
+        conn.executemany("UPDATE jobs SET date_scraped = ? WHERE job_id = ?",
+                         [(f"2025-01-0{i + 1} 00:00:00", f"job{i}") for i in range(3)])
+        conn.commit()
+        conn.close()
+
+    def score(self, job_id, profile_id, model="ollama/qwen3:8b", prompt="p1", profile="a1", resume="r1"):
+        self.repo.insert_scores([(job_id, profile_id, model, 70, 60, "Fit", 0, prompt, profile, resume)])
+
+    def stale(self, model_ids=("ollama/qwen3:8b",)):
+        jobs = self.repo.get_stale_scores(self.FINGERPRINTS, list(model_ids))
+        return [(job["job_id"], job["profile_ids"]) for job in jobs]
+
+    def test_only_changed_inputs_are_stale(self):
+        """Test that scores with a changed prompt, profile, resume or model are stale, newest jobs first."""
+        self.score("job0", "alice")
+        self.score("job0", "bob", profile="b0", resume="r2")
+        self.score("job1", "alice", prompt="p0")
+        self.score("job2", "alice", model="gemini/gemma-3-27b-it")
+
+        self.assertEqual(self.stale(), [("job2", ["alice"]), ("job1", ["alice"]), ("job0", ["bob"])])
+
+    def test_limit_counts_stale_jobs_only(self):
+        """Test that jobs with only fresh scores do not use up the limit."""
+        self.score("job2", "alice")
+        self.score("job1", "alice", prompt="p0")
+        self.score("job0", "alice", prompt="p0")
+
+        jobs = self.repo.get_stale_scores(self.FINGERPRINTS, ["ollama/qwen3:8b"], limit=1)
+
+        self.assertEqual([(job["job_id"], job["profile_ids"]) for job in jobs], [("job1", ["alice"])])
+
+    def test_excluded_pairs_are_not_stale(self):
+        """Test that stale pairs that already failed in this run are skipped."""
+        self.score("job2", "alice", prompt="p0")
+        self.score("job1", "alice", prompt="p0")
+        jobs = self.repo.get_stale_scores(self.FINGERPRINTS, ["ollama/qwen3:8b"], exclude={("job2", "alice")})
+        self.assertEqual([job["job_id"] for job in jobs], ["job1"])
+
+    def test_unknown_and_current_prefilter_scores_are_not_stale(self):
+        """Test that scores without fingerprints and prefilter scores for the current inputs are not re-queued."""
+        self.score("job0", "alice", prompt=None, profile=None, resume=None)
+        self.score("job1", "alice", model="relevance-prefilter", prompt=None)
+        self.assertEqual(self.stale(), [])
+
+    def test_prefilter_scores_for_old_inputs_are_stale(self):
+        """Test that prefilter scores made with another profile or resume are re-queued."""
+        self.score("job0", "alice", model="relevance-prefilter", prompt=None, profile="a0")
+        self.score("job1", "bob", model="relevance-prefilter", prompt=None, profile="b1", resume="r1")
+        self.assertEqual(self.stale(), [("job1", ["bob"]), ("job0", ["alice"])])
+
+    def test_a_fresh_score_from_another_model_wins(self):
+        """Test that a job is not stale when any of its scores matches the current inputs."""
+        self.score("job0", "alice", model="gemini/gemma-3-27b-it")
+        self.score("job0", "alice")
+        self.assertEqual(self.stale(), [])
+        self.assertEqual(self.stale(model_ids=["openrouter/llama"]), [("job0", ["alice"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import gspread
+
+from src.sheets import manager
+
+HEADERS = ["job_id", "job_title", "last_synced", "date_updated"]
+
+
+def rate_limit_error():
+    response = MagicMock()
+    response.json.return_value = {"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+    response.headers = {"retry-after": "0"}
+    return gspread.exceptions.APIError(response)
+
+
+def row(job_id, title="Analyst"):
+    return job_id, title, None, "2024-02-01T00:00:00"
+
+
+def mirrored(job_id, row_number, title="Analyst"):
+    return job_id, (row_number, manager._row_hash(list(map(str, row(job_id, title))), HEADERS.index("last_synced")))
+
+
+class TestSyncJobsToSheet(unittest.TestCase):
+    def run_sync(self, sheet, rows, index, **sheet_config):
+        repo = MagicMock()
+        repo.get_jobs_for_sheet.return_value = (HEADERS, rows)
+        repo.get_sheet_rows.return_value = index
+        client = MagicMock()
+        client.open.return_value.sheet1 = sheet
+        with patch.object(manager, "repo", repo), \
+                patch.object(manager, "ServiceAccountCredentials"), \
+                patch.object(manager.gspread, "authorize", return_value=client), \
+                patch.object(manager.time, "sleep"):
+            manager.sync_jobs_to_sheet({"google_sheet": {"sheet_name": "Jobs", **sheet_config}})
+        return repo
+
+    def test_only_changed_rows_are_written_in_batches(self):
+        """Test that rows with unchanged content hashes are skipped and changes are chunked."""
+        sheet = MagicMock()
+        sheet.col_values.return_value = ["job_id", "a", "b"]
+        sheet.append_rows.side_effect = [{"updates": {"updatedRange": f"Sheet1!A{n}:D{n + 1}"}} for n in (4, 6, 8)]
+        index = dict([mirrored("a", 2, title="Old title"), mirrored("b", 3)])
+        rows = [row("a"), row("b")] + [row(f"new{i}") for i in range(5)]
+
+        repo = self.run_sync(sheet, rows, index, batch_rows=2)
+
+        sheet.get_all_records.assert_not_called()
+        sheet.get_all_values.assert_not_called()
+        sheet.batch_update.assert_called_once()
+        self.assertEqual(sheet.batch_update.call_args[0][0][0]["range"], "A2:D2")
+        self.assertEqual([len(call[0][0]) for call in sheet.append_rows.call_args_list], [2, 2, 1])
+        synced = [job_id for call in repo.mark_synced.call_args_list for job_id in call[0][0]]
+        self.assertEqual(synced, ["a", "new0", "new1", "new2", "new3", "new4"])
+        recorded = {entry[0]: entry[1] for call in repo.upsert_sheet_rows.call_args_list for entry in call[0][1]}
+        self.assertEqual(recorded, {"a": 2, "new0": 4, "new1": 5, "new2": 6, "new3": 7, "new4": 8})
+
+    def test_mismatched_mirror_is_rebuilt(self):
+        """Test that the mirror is rebuilt from the sheet when the job_id column differs."""
+        sheet = MagicMock()
+        sheet.col_values.return_value = ["job_id", "b", "a"]
+        sheet.get_all_values.return_value = [
+            HEADERS,
+            ["b", "Analyst", "2024-03-01T00:00:00", "2024-02-01T00:00:00"],
+            ["a", "Analyst", "2024-03-01T00:00:00", "2024-02-01T00:00:00"],
+        ]
+        index = dict([mirrored("a", 2), mirrored("b", 3)])
+
+        repo = self.run_sync(sheet, [row("a"), row("b")], index)
+
+        sheet.get_all_values.assert_called_once()
+        rebuilt = {entry[0]: entry[1] for entry in repo.replace_sheet_rows.call_args[0][1]}
+        self.assertEqual(rebuilt, {"b": 2, "a": 3})
+        sheet.batch_update.assert_not_called()
+        sheet.append_rows.assert_not_called()
+
+    def test_rate_limited_chunk_is_retried(self):
+        """Test that a 429 retries only the failed chunk instead of restarting the sync."""
+        sheet = MagicMock()
+        sheet.col_values.return_value = ["job_id"]
+        sheet.append_rows.side_effect = [None, rate_limit_error(), None]
+        rows = [row(f"new{i}") for i in range(4)]
+
+        repo = self.run_sync(sheet, rows, {}, batch_rows=2)
+
+        self.assertEqual(sheet.append_rows.call_count, 3)
+        self.assertEqual(sheet.col_values.call_count, 1)
+        self.assertEqual(repo.mark_synced.call_count, 2)
+        recorded = [entry[1] for call in repo.upsert_sheet_rows.call_args_list for entry in call[0][1]]
+        self.assertEqual(recorded, [2, 3, 4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
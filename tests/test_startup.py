@@ -0,0 +1,55 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only by the commands that need them
+HEAVY_MODULES = ["playwright", "google.genai", "openai", "ollama", "gspread", "oauth2client", "scipy", "numpy",
+                 "pyarrow"]
+IMPORT_BUDGET_SECONDS = 1.0
+
+
+def import_main(workdir):
+    script = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        "import main\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    output = subprocess.run([sys.executable, "-c", script], cwd=workdir, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestStartup(unittest.TestCase):
+    def test_importing_main_is_cheap(self):
+        """Test that importing main loads no backend SDKs, creates no files and stays within the time budget."""
+        with tempfile.TemporaryDirectory() as workdir:
+            result = import_main(workdir)
+            self.assertEqual(os.listdir(workdir), [])
+
+        self.assertEqual(result["loaded"], [])
+        self.assertLess(result["elapsed"], IMPORT_BUDGET_SECONDS)
+
+    def test_commands_without_logging_create_no_log_file(self):
+        """Test that commands that do not log leave no scraper.log behind."""
+        with tempfile.TemporaryDirectory() as workdir:
+            shutil.copy(os.path.join(REPO_ROOT, "app.yaml"), workdir)
+            os.makedirs(os.path.join(workdir, "db"))
+            env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+            subprocess.run([sys.executable, os.path.join(REPO_ROOT, "main.py"), "--init-db"], cwd=workdir, env=env,
+                           check=True, capture_output=True)
+
+            self.assertTrue(os.path.exists(os.path.join(workdir, "db", "job_matches.sqlite")))
+            self.assertFalse(os.path.exists(os.path.join(workdir, "scraper.log")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from src.llm.streaming import DeadlineExceeded, RatingStream, RequestCancelled, collect_stream
+
+VALID = '{"match_score": 85, "likelihood_score": 70, "match_reason": "Good fit", "likelihood_reason": "Some gaps"}'
+
+
+class ClosableStream:
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            self.consumed += 1
+            yield piece
+
+    def close(self):
+        self.closed = True
+
+
+def split(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestStreaming(unittest.TestCase):
+    def test_stream_stops_after_complete_rating(self):
+        """Test that consumption stops once a complete rating has streamed in."""
+        stream = ClosableStream(split(VALID) + ["\n\nSome trailing commentary"] * 50)
+        text = collect_stream(stream, lambda piece: piece)
+
+        self.assertEqual(text.strip(), VALID)
+        self.assertEqual(stream.consumed, len(split(VALID)))
+        self.assertTrue(stream.closed)
+
+    def test_braces_inside_thinking_do_not_stop_stream(self):
+        """Test that JSON-like text inside a think block is ignored."""
+        rating_stream = RatingStream()
+        self.assertFalse(rating_stream.feed('<think>maybe {"match_score": 1} ...'))
+        self.assertFalse(rating_stream.feed(' still thinking }'))
+        self.assertFalse(rating_stream.feed('</think>'))
+        self.assertTrue(rating_stream.feed(VALID))
+        self.assertEqual(rating_stream.rating.match_score, 85)
+
+    def test_brace_inside_string_does_not_stop_stream(self):
+        """Test that a closing brace inside a reason string does not end the stream early."""
+        rating_stream = RatingStream()
+        self.assertFalse(rating_stream.feed('{"match_score": 85, "likelihood_score": 70, "match_reason": "a }'))
+        self.assertTrue(rating_stream.feed('", "likelihood_reason": "b"}'))
+
+    def test_deadline_exceeded(self):
+        """Test that a stream running past its deadline raises DeadlineExceeded."""
+        with patch("src.llm.streaming.time.monotonic", side_effect=[0, 5, 11]):
+            with self.assertRaises(DeadlineExceeded):
+                collect_stream(ClosableStream(["<think>", "hmm", "hmm"]), lambda piece: piece, deadline=10)
+
+    def test_cancelled_stream(self):
+        """Test that a set cancel event aborts the stream."""
+        cancel_event = threading.Event()
+        cancel_event.set()
+        stream = ClosableStream(["a", "b"])
+        with self.assertRaises(RequestCancelled):
+            collect_stream(stream, lambda piece: piece, cancel_event=cancel_event)
+        self.assertTrue(stream.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()